@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import boto3
+import http_health_check
+import ecs_health_check
+
+log = logging.getLogger("deploy-health-check")
+
+
+def run(http_config, ecs_check=None):
+    """
+    Run the HTTP and ECS checks side by side
+
+    `ecs_check` is a callable taking a stop event and returning (ok, report),
+    or None to skip ECS. The first check to fail, or raise, cancels the other.
+    """
+    stop_event = threading.Event()
+
+    def guarded(check):
+        try:
+            ok, report = check(stop_event)
+        except Exception as e:
+            log.exception("Health check raised")
+            ok, report = False, {"ok": False, "reason": "error", "error": str(e)}
+        if not ok:
+            stop_event.set()
+        return ok, report
+
+    checks = {"http": lambda stop: http_health_check.run_checks(http_config, stop)}
+    if ecs_check is not None:
+        checks["ecs"] = ecs_check
+
+    with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+        futures = {name: pool.submit(guarded, check) for name, check in checks.items()}
+        results = {name: future.result() for name, future in futures.items()}
+
+    return all(ok for ok, _ in results.values()), {name: report for name, (_, report) in results.items()}
+
+
+def build_ecs_check():
+    cluster = os.environ.get("CLUSTER_NAME", "")
+    services = [s for s in os.environ.get("SERVICES", "").replace(" ", "").split(",") if s]
+    if not cluster or not services:
+        log.info("CLUSTER_NAME/SERVICES not set; skipping ECS check.")
+        return None
+
+    ecs = boto3.client("ecs", region_name=os.environ.get("AWS_REGION"))
+    timeout = int(os.environ.get("HEALTH_TIMEOUT", "360"))
+    return lambda stop: ecs_health_check.wait_for_services(ecs, cluster, services, timeout, stop_event=stop)
+
+
+def main():
+    ok, report = run(http_health_check.load_config(), build_ecs_check())
+    print(json.dumps(report, indent=2))
+
+    report_file = os.environ.get("HEALTH_REPORT_FILE")
+    if report_file:
+        with open(report_file, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,49 +1,93 @@
 import os
 import sys
 import time
+import threading
 import boto3
+from http_health_check import AdaptiveInterval
+
+
+def service_states(ecs, cluster, services):
+    """describe_services for every service in one call -> {name: (healthy, summary)}"""
+    resp = ecs.describe_services(cluster=cluster, services=services)
+    states = {}
+    for svc in resp.get("services", []):
+        name = svc.get("serviceName")
+        deployments = svc.get("deployments", [])
+        primary = next((d for d in deployments if d.get("status") == "PRIMARY"), None)
+        if not primary:
+            states[name] = (False, "no PRIMARY deployment")
+            continue
+        desired = primary.get("desiredCount", 0)
+        running = primary.get("runningCount", 0)
+        failed = primary.get("failedTasks", 0)
+        healthy = desired == running and failed == 0
+        states[name] = (healthy, f"desired={desired}, running={running}, failed={failed}")
+    for failure in resp.get("failures", []):
+        states[failure.get("arn", "unknown")] = (False, failure.get("reason", "describe failure"))
+    return states
+
+
+def wait_for_services(ecs, cluster, services, timeout, poll_min=3, poll_max=15, stop_event=None, max_errors=3):
+    """
+    Poll until every service's PRIMARY deployment is fully running; returns (ok, report)
+
+    Failed describe_services calls (throttling, a credentials refresh) are
+    retried on the next poll; max_errors failures in a row fail the check.
+    """
+    stop_event = stop_event or threading.Event()
+    interval = AdaptiveInterval(poll_min, poll_max)
+    start = time.time()
+    states = {}
+    errors = 0
+
+    while time.time() - start < timeout and not stop_event.is_set():
+        try:
+            states = service_states(ecs, cluster, services)
+            errors = 0
+        except Exception as e:
+            errors += 1
+            print(f"describe_services failed ({errors}/{max_errors}): {e}")
+            if errors >= max_errors:
+                return False, {
+                    "ok": False,
+                    "reason": "error",
+                    "error": str(e),
+                    "elapsed_seconds": round(time.time() - start, 1),
+                }
+            remaining = timeout - (time.time() - start)
+            stop_event.wait(max(0, min(interval.next(("error", errors)), remaining)))
+            continue
+
+        for name, (healthy, summary) in states.items():
+            print(f"{name}: {'healthy' if healthy else 'unhealthy'} ({summary})")
+        if states and all(healthy for healthy, _ in states.values()):
+            return True, {"ok": True, "reason": "healthy", "elapsed_seconds": round(time.time() - start, 1)}
+
+        remaining = timeout - (time.time() - start)
+        # the running counts change as tasks start; poll quickly while they move
+        stop_event.wait(max(0, min(interval.next(tuple(sorted(states.items()))), remaining)))
+
+    reason = "cancelled" if stop_event.is_set() else "timeout"
+    if reason == "timeout":
+        print("Health check timed out")
+    return False, {
+        "ok": False,
+        "reason": reason,
+        "elapsed_seconds": round(time.time() - start, 1),
+        "services": {name: summary for name, (_, summary) in states.items()},
+    }
 
 
 def main():
     cluster = os.environ["CLUSTER_NAME"]
     services = os.environ["SERVICES"].split(",")
     timeout = int(os.environ.get("HEALTH_TIMEOUT", "360"))
-    sleep = 10
     region = os.environ.get("AWS_REGION")
 
     ecs = boto3.client("ecs", region_name=region)
-    start = time.time()
-
-    def healthy():
-        resp = ecs.describe_services(cluster=cluster, services=services)
-        ok = True
-        for svc in resp.get("services", []):
-            name = svc.get("serviceName")
-            deployments = svc.get("deployments", [])
-            primary = next((d for d in deployments if d.get("status") == "PRIMARY"), None)
-            if not primary:
-                ok = False
-                print(f"{name}: no PRIMARY deployment")
-                continue
-            desired = primary.get("desiredCount", 0)
-            running = primary.get("runningCount", 0)
-            failed = primary.get("failedTasks", 0)
-            if desired == running and failed == 0:
-                print(f"{name}: healthy (desired={desired}, running={running}, failed={failed})")
-            else:
-                ok = False
-                print(f"{name}: unhealthy (desired={desired}, running={running}, failed={failed})")
-        return ok
-
-    while time.time() - start < timeout:
-        if healthy():
-            return 0
-        time.sleep(sleep)
-
-    print("Health check timed out")
-    return 1
+    ok, _ = wait_for_services(ecs, cluster, services, timeout)
+    return 0 if ok else 1
 
 
 if __name__ == "__main__":
     sys.exit(main())
-
@@ -3,7 +3,9 @@ import sys
 import time
 import json
 import logging
+import threading
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s\t%(message)s")
 log = logging.getLogger("http-health-check")
@@ -17,59 +19,197 @@ def fetch(url, timeout):
     return status, body
 
 
-def check_endpoint(url, per_request_timeout):
+def probe(url, per_request_timeout):
+    """Single request -> (ok, latency_seconds, detail)"""
+    started = time.perf_counter()
     try:
         status, body = fetch(url, per_request_timeout)
-        if status != 200:
-            log.warning("Endpoint %s returned %s", url, status)
-            return False
-        # try json parse for optional status/healthy fields
-        try:
-            data = json.loads(body)
-            if isinstance(data, dict):
-                if "status" in data and data["status"] not in ("healthy", "ok", "accepted"):
-                    log.warning("Endpoint %s json status not healthy: %s", url, data.get("status"))
-                    return False
-        except Exception:
-            pass
-        log.info("Endpoint %s is healthy", url)
-        return True
     except Exception as e:
-        log.warning("Endpoint %s check failed: %s", url, e)
-        return False
+        return False, time.perf_counter() - started, str(e)
+    latency = time.perf_counter() - started
 
+    if status != 200:
+        return False, latency, f"status {status}"
+    # try json parse for optional status/healthy fields
+    try:
+        data = json.loads(body)
+        if isinstance(data, dict) and "status" in data and data["status"] not in ("healthy", "ok", "accepted"):
+            return False, latency, f"json status {data.get('status')}"
+    except Exception:
+        pass
+    return True, latency, "ok"
 
-def main():
+
+def p95(samples):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(int(0.95 * len(ordered)), len(ordered) - 1)]
+
+
+def check_endpoint(url, per_request_timeout, burst=5, concurrency=5, slo_p95_ms=None, slo_error_rate=None):
+    """
+    Send a short burst to one endpoint and grade it
+
+    Returns a dict with up (any request succeeded), p95_ms, error_rate and
+    within_slo (p95 and error rate under the configured limits).
+    """
+    with ThreadPoolExecutor(max_workers=max(1, min(burst, concurrency))) as pool:
+        results = list(pool.map(lambda _: probe(url, per_request_timeout), range(burst)))
+
+    failures = [detail for ok, _, detail in results if not ok]
+    latencies = [latency for ok, latency, _ in results if ok]
+    error_rate = len(failures) / len(results)
+    latency_p95 = p95(latencies)
+    p95_ms = round(latency_p95 * 1000, 1) if latency_p95 is not None else None
+
+    breaches = []
+    if slo_p95_ms is not None and p95_ms is not None and p95_ms > slo_p95_ms:
+        breaches.append(f"p95 {p95_ms}ms > {slo_p95_ms}ms")
+    if slo_error_rate is not None and error_rate > slo_error_rate:
+        breaches.append(f"error rate {error_rate:.0%} > {slo_error_rate:.0%}")
+
+    result = {
+        "url": url,
+        "up": bool(latencies),
+        "requests": len(results),
+        "error_rate": round(error_rate, 3),
+        "p95_ms": p95_ms,
+        "within_slo": bool(latencies) and not breaches,
+        "breaches": breaches,
+        "last_error": failures[-1] if failures else None,
+    }
+    if not result["up"]:
+        log.warning("Endpoint %s is down: %s", url, result["last_error"])
+    elif breaches:
+        log.warning("Endpoint %s breaches SLO: %s", url, "; ".join(breaches))
+    else:
+        log.info("Endpoint %s is healthy (p95=%sms, errors=%s)", url, p95_ms, result["error_rate"])
+    return result
+
+
+def check_all(endpoints, per_request_timeout, burst, concurrency, slo_p95_ms, slo_error_rate):
+    """Probe every endpoint at once"""
+    with ThreadPoolExecutor(max_workers=len(endpoints)) as pool:
+        return list(
+            pool.map(
+                lambda url: check_endpoint(url, per_request_timeout, burst, concurrency, slo_p95_ms, slo_error_rate),
+                endpoints,
+            )
+        )
+
+
+class AdaptiveInterval:
+    """Poll fast while things are changing, back off while they stay the same"""
+
+    def __init__(self, minimum=2.0, maximum=15.0, factor=1.5):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.current = minimum
+        self.last_state = None
+
+    def next(self, state):
+        if state != self.last_state:
+            self.current = self.minimum
+        else:
+            self.current = min(self.current * self.factor, self.maximum)
+        self.last_state = state
+        return self.current
+
+
+def optional_float(name):
+    value = os.environ.get(name, "")
+    return float(value) if value else None
+
+
+def load_config():
     endpoints = os.environ.get("HEALTH_ENDPOINTS", "").replace(" ", "").split(",")
-    endpoints = [e for e in endpoints if e]
+    return {
+        "endpoints": [e for e in endpoints if e],
+        "timeout": int(os.environ.get("HEALTH_TIMEOUT", "360")),
+        "per_request_timeout": int(os.environ.get("HEALTH_PER_REQUEST_TIMEOUT", "10")),
+        "min_success": int(os.environ.get("HEALTH_MIN_SUCCESS", "1")),  # number of consecutive passes
+        "burst": int(os.environ.get("HEALTH_BURST", "5")),
+        "concurrency": int(os.environ.get("HEALTH_BURST_CONCURRENCY", "5")),
+        "slo_p95_ms": optional_float("HEALTH_SLO_P95_MS"),
+        "slo_error_rate": optional_float("HEALTH_SLO_ERROR_RATE"),
+        "max_slo_breaches": int(os.environ.get("HEALTH_MAX_SLO_BREACHES", "3")),
+        "poll_min": float(os.environ.get("HEALTH_POLL_MIN", "2")),
+        "poll_max": float(os.environ.get("HEALTH_POLL_MAX", "15")),
+    }
+
+
+def run_checks(config, stop_event=None):
+    """
+    Poll all endpoints until they pass min_success rounds in a row
+
+    Down endpoints are retried until the timeout (tasks may still be starting);
+    endpoints that are up but breach the SLOs for max_slo_breaches rounds in a
+    row fail the check immediately. Returns (ok, report).
+    """
+    stop_event = stop_event or threading.Event()
+    endpoints = config["endpoints"]
     if not endpoints:
         log.info("No endpoints provided; skipping health check.")
-        return 0
-
-    timeout = int(os.environ.get("HEALTH_TIMEOUT", "360"))
-    per_request_timeout = int(os.environ.get("HEALTH_PER_REQUEST_TIMEOUT", "10"))
-    min_success = int(os.environ.get("HEALTH_MIN_SUCCESS", "1"))  # number of consecutive passes
+        return True, {"skipped": True}
 
+    interval = AdaptiveInterval(config["poll_min"], config["poll_max"])
     start = time.time()
     consecutive = 0
-    while time.time() - start < timeout:
-        all_ok = True
-        for url in endpoints:
-            if not check_endpoint(url, per_request_timeout):
-                all_ok = False
+    slo_breaches = 0
+    rounds = 0
+    results = []
+
+    while time.time() - start < config["timeout"] and not stop_event.is_set():
+        rounds += 1
+        results = check_all(
+            endpoints,
+            config["per_request_timeout"],
+            config["burst"],
+            config["concurrency"],
+            config["slo_p95_ms"],
+            config["slo_error_rate"],
+        )
+        all_up = all(r["up"] for r in results)
+        all_ok = all(r["within_slo"] for r in results)
+
         if all_ok:
             consecutive += 1
-            if consecutive >= min_success:
+            slo_breaches = 0
+            if consecutive >= config["min_success"]:
                 log.info("All endpoints healthy.")
-                return 0
+                return True, report(True, "healthy", rounds, start, results)
         else:
             consecutive = 0
-        time.sleep(10)
+            slo_breaches = slo_breaches + 1 if all_up else 0
+            if slo_breaches >= config["max_slo_breaches"]:
+                log.error("SLO breached for %s consecutive rounds", slo_breaches)
+                return False, report(False, "slo_breach", rounds, start, results)
+
+        remaining = config["timeout"] - (time.time() - start)
+        stop_event.wait(max(0, min(interval.next((all_up, all_ok, consecutive)), remaining)))
+
+    if stop_event.is_set():
+        return False, report(False, "cancelled", rounds, start, results)
+    log.error("Health check timed out after %ss", config["timeout"])
+    return False, report(False, "timeout", rounds, start, results)
+
 
-    log.error("Health check timed out after %ss", timeout)
-    return 1
+def report(ok, reason, rounds, start, results):
+    return {
+        "ok": ok,
+        "reason": reason,
+        "rounds": rounds,
+        "elapsed_seconds": round(time.time() - start, 1),
+        "endpoints": results,
+    }
+
+
+def main():
+    ok, _ = run_checks(load_config())
+    return 0 if ok else 1
 
 
 if __name__ == "__main__":
     sys.exit(main())
-
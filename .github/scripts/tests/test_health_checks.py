@@ -0,0 +1,147 @@
+import sys
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+import deploy_health_check  # noqa: E402
+import ecs_health_check  # noqa: E402
+import http_health_check  # noqa: E402
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(0.2)
+        status = 500 if self.path == "/down" else 200
+        body = json.dumps({"status": "healthy"}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def make_config(endpoints, **overrides):
+    config = {
+        "endpoints": endpoints,
+        "timeout": 5,
+        "per_request_timeout": 2,
+        "min_success": 2,
+        "burst": 4,
+        "concurrency": 4,
+        "slo_p95_ms": 100.0,
+        "slo_error_rate": 0.0,
+        "max_slo_breaches": 2,
+        "poll_min": 0.01,
+        "poll_max": 0.05,
+    }
+    config.update(overrides)
+    return config
+
+
+class FakeECS:
+    def __init__(self, running_counts):
+        self.running_counts = iter(running_counts)
+
+    def describe_services(self, cluster, services):
+        running = next(self.running_counts)
+        if isinstance(running, Exception):
+            raise running
+        deployment = {"status": "PRIMARY", "desiredCount": 2, "runningCount": running, "failedTasks": 0}
+        return {"services": [{"serviceName": name, "deployments": [deployment]} for name in services]}
+
+
+def test_healthy_endpoints_pass(stub_server):
+    ok, report = http_health_check.run_checks(make_config([f"{stub_server}/health", f"{stub_server}/ok"]))
+
+    assert ok is True
+    assert report["rounds"] == 2
+    assert all(endpoint["p95_ms"] < 100 for endpoint in report["endpoints"])
+
+
+def test_latency_slo_breach_fails_fast(stub_server):
+    ok, report = http_health_check.run_checks(make_config([f"{stub_server}/health", f"{stub_server}/slow"]))
+
+    assert ok is False
+    assert report["reason"] == "slo_breach"
+    slow = next(e for e in report["endpoints"] if e["url"].endswith("/slow"))
+    assert slow["up"] is True and slow["within_slo"] is False
+
+
+def test_down_endpoint_times_out(stub_server):
+    ok, report = http_health_check.run_checks(make_config([f"{stub_server}/down"], timeout=0.3))
+
+    assert ok is False
+    assert report["reason"] == "timeout"
+    assert report["endpoints"][0]["error_rate"] == 1.0
+
+
+def test_ecs_and_http_run_together(stub_server):
+    ecs = FakeECS([1, 1, 2])
+
+    def ecs_check(stop):
+        return ecs_health_check.wait_for_services(
+            ecs, "cluster", ["api"], 5, poll_min=0.01, poll_max=0.05, stop_event=stop
+        )
+
+    ok, report = deploy_health_check.run(make_config([f"{stub_server}/health"]), ecs_check)
+
+    assert ok is True
+    assert report["ecs"]["reason"] == "healthy"
+    assert report["http"]["reason"] == "healthy"
+
+
+def test_failing_check_cancels_the_other(stub_server):
+    ecs = FakeECS([1] * 1000)
+
+    def ecs_check(stop):
+        return ecs_health_check.wait_for_services(
+            ecs, "cluster", ["api"], 30, poll_min=0.01, poll_max=0.05, stop_event=stop
+        )
+
+    ok, report = deploy_health_check.run(make_config([f"{stub_server}/slow"]), ecs_check)
+
+    assert ok is False
+    assert report["http"]["reason"] == "slo_breach"
+    assert report["ecs"]["reason"] == "cancelled"
+
+
+def test_ecs_retries_transient_errors():
+    ecs = FakeECS([RuntimeError("Throttling"), 1, RuntimeError("Throttling"), 2])
+
+    ok, report = ecs_health_check.wait_for_services(ecs, "cluster", ["api"], 5, poll_min=0.01, poll_max=0.05)
+
+    assert ok is True
+    assert report["reason"] == "healthy"
+
+
+def test_raising_check_cancels_the_other(stub_server):
+    def ecs_check(stop):
+        raise RuntimeError("ExpiredTokenException")
+
+    started = time.monotonic()
+    ok, report = deploy_health_check.run(make_config([f"{stub_server}/down"], timeout=30), ecs_check)
+
+    assert ok is False
+    assert time.monotonic() - started < 5
+    assert report["ecs"] == {"ok": False, "reason": "error", "error": "ExpiredTokenException"}
+    assert report["http"]["reason"] == "cancelled"
@@ -0,0 +1,112 @@
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, Any, Optional
+
+
+class LocalSQS:
+    """
+    In-process stand-in for the SQS client calls used by the API and worker
+
+    Supports long polling, visibility timeouts and the batch visibility call
+    used by drain. Every call sleeps `latency_ms` first to mimic a network hop.
+    """
+
+    def __init__(self, latency_ms: float = 0, visibility_timeout: int = 60):
+        self.latency = latency_ms / 1000
+        self.visibility_timeout = visibility_timeout
+        self.queues: Dict[str, deque] = {}
+        self.in_flight: Dict[str, Dict[str, Any]] = {}
+        self.condition = threading.Condition()
+        self.closed = False
+        self.calls = {"send_message": 0, "receive_message": 0, "delete_message": 0}
+
+    def _delay(self, name: str):
+        with self.condition:
+            self.calls[name] = self.calls.get(name, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _requeue_expired(self, now: float):
+        for handle, entry in list(self.in_flight.items()):
+            if entry["visible_at"] <= now:
+                del self.in_flight[handle]
+                self.queues.setdefault(entry["queue_url"], deque()).appendleft(entry["message"])
+
+    def send_message(self, QueueUrl: str, MessageBody: str, MessageAttributes: Optional[dict] = None, **kwargs):
+        self._delay("send_message")
+        message_id = uuid.uuid4().hex
+        message = {
+            "MessageId": message_id,
+            "Body": MessageBody,
+            "MessageAttributes": MessageAttributes or {},
+            "Attributes": {"SentTimestamp": str(int(time.time() * 1000))},
+        }
+        with self.condition:
+            self.queues.setdefault(QueueUrl, deque()).append(message)
+            self.condition.notify_all()
+        return {"MessageId": message_id}
+
+    def receive_message(self, QueueUrl: str, MaxNumberOfMessages: int = 1, WaitTimeSeconds: int = 0, **kwargs):
+        self._delay("receive_message")
+        deadline = time.monotonic() + WaitTimeSeconds
+        with self.condition:
+            while True:
+                self._requeue_expired(time.monotonic())
+                queue = self.queues.setdefault(QueueUrl, deque())
+                remaining = deadline - time.monotonic()
+                if queue or self.closed or remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+            messages = []
+            while queue and len(messages) < MaxNumberOfMessages:
+                message = dict(queue.popleft(), ReceiptHandle=uuid.uuid4().hex)
+                self.in_flight[message["ReceiptHandle"]] = {
+                    "queue_url": QueueUrl,
+                    "message": {k: v for k, v in message.items() if k != "ReceiptHandle"},
+                    "visible_at": time.monotonic() + kwargs.get("VisibilityTimeout", self.visibility_timeout),
+                }
+                messages.append(message)
+        return {"Messages": messages} if messages else {}
+
+    def delete_message(self, QueueUrl: str, ReceiptHandle: str):
+        self._delay("delete_message")
+        with self.condition:
+            self.in_flight.pop(ReceiptHandle, None)
+        return {}
+
+    def change_message_visibility_batch(self, QueueUrl: str, Entries: list):
+        self._delay("change_message_visibility_batch")
+        with self.condition:
+            for entry in Entries:
+                in_flight = self.in_flight.get(entry["ReceiptHandle"])
+                if in_flight:
+                    in_flight["visible_at"] = time.monotonic() + entry["VisibilityTimeout"]
+            self.condition.notify_all()
+        return {"Successful": [{"Id": e["Id"]} for e in Entries], "Failed": []}
+
+    def close(self):
+        """Wake any long-polling receivers so worker threads can exit"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class LocalS3:
+    """In-memory stand-in for S3 put_object that records when each key landed"""
+
+    def __init__(self, latency_ms: float = 0):
+        self.latency = latency_ms / 1000
+        self.objects: Dict[str, bytes] = {}
+        self.put_times: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def put_object(self, Bucket: str, Key: str, Body, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.objects[f"{Bucket}/{Key}"] = Body
+            self.put_times[Key.rsplit("/", 1)[-1].rsplit(".", 1)[0]] = time.perf_counter()
+        return {"ETag": uuid.uuid4().hex}
@@ -0,0 +1,295 @@
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Any, List
+import httpx
+from local_stack import LocalS3, LocalSQS
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+API_DIR = ROOT_DIR / "service-1-api"
+WORKER_DIR = ROOT_DIR / "service-2-worker"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+QUEUE_URL = "http://localstack.local/queue/emails"
+SHARED_MODULES = ("config", "log_config")
+
+
+def import_service(directory: Path, module_name: str):
+    """Import a service module; both services ship top-level `config`/`log_config` modules, so isolate them"""
+    for name in SHARED_MODULES:
+        sys.modules.pop(name, None)
+    sys.path.insert(0, str(directory))
+    try:
+        return importlib.import_module(module_name)
+    finally:
+        sys.path.remove(str(directory))
+        for name in SHARED_MODULES:
+            sys.modules.pop(name, None)
+
+
+def percentiles(samples: List[float]) -> Dict[str, Any]:
+    if not samples:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "max": None, "mean": None}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": round(ordered[-1] * 1000, 3),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 3),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+class SlowStream:
+    """File wrapper whose writes block for `latency_ms`, like stdout into a backed-up log driver"""
+
+    def __init__(self, stream, latency_ms: float):
+        self.stream = stream
+        self.latency = latency_ms / 1000
+
+    def write(self, data: str):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.stream.write(data)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class LocalStack:
+    """Wire app.py and EmailWorker to shared in-process SQS/S3 stand-ins"""
+
+    def __init__(self, sqs_latency_ms: float, s3_latency_ms: float, worker_poll_interval: float):
+        self.sqs = LocalSQS(sqs_latency_ms)
+        self.s3 = LocalS3(s3_latency_ms)
+
+        self.api = import_service(API_DIR, "app")
+        # lane maps are parsed when settings load, so swap in a fresh instance rather than mutating
+        self.api.settings = type(self.api.settings)(
+            use_mock_sqs=False, sqs_queue_url=QUEUE_URL, sqs_priority_queue_urls=""
+        )
+        self.api.sqs_client = self.sqs
+
+        worker_module = import_service(WORKER_DIR, "worker")
+        self.configure_logging = worker_module.configure_logging
+        self.dropped_log_records = worker_module.dropped_records
+        worker_settings = worker_module.settings
+        worker_settings.use_mock_sqs = False
+        worker_settings.use_mock_s3 = False
+        worker_settings.sqs_queue_url = QUEUE_URL
+        worker_settings.sqs_priority_queue_urls = ""
+        worker_settings.poll_interval_seconds = worker_poll_interval
+
+        self.worker = worker_module.EmailWorker()
+        self.worker.sqs.sqs_client = self.sqs
+        self.worker.s3.s3_client = self.s3
+        self.worker_thread = threading.Thread(target=self.worker.run, name="email-worker", daemon=True)
+
+    def start(self):
+        self.worker_thread.start()
+
+    def stop(self):
+        self.worker._handle_signal(15, None)
+        self.sqs.close()
+        self.worker_thread.join(timeout=30)
+
+
+async def drive_load(client: httpx.AsyncClient, total: int, concurrency: int, token: str) -> Dict[str, Any]:
+    latencies = []
+    sent_at = {}
+    errors = {}
+    counter = iter(range(total))
+
+    async def user():
+        for _ in counter:
+            payload = {
+                "data": {
+                    "email_subject": "Benchmark",
+                    "email_sender": "bench@example.com",
+                    "email_timestream": str(int(time.time())),
+                    "email_content": "Load test message body",
+                },
+                "token": token,
+            }
+            started = time.perf_counter()
+            try:
+                response = await client.post("/send-email", json=payload)
+            except httpx.HTTPError as e:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            if response.status_code == 200:
+                sent_at[response.json()["message_id"]] = started
+            else:
+                errors[str(response.status_code)] = errors.get(str(response.status_code), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    return {"elapsed": time.perf_counter() - started, "latencies": latencies, "sent_at": sent_at, "errors": errors}
+
+
+def wait_for_delivery(s3: LocalS3, message_ids, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with s3.lock:
+            if all(message_id in s3.put_times for message_id in message_ids):
+                break
+        time.sleep(0.01)
+
+
+def run(args) -> Dict[str, Any]:
+    stack = LocalStack(args.sqs_latency_ms, args.s3_latency_ms, args.worker_poll_interval)
+    log_settings = SimpleNamespace(
+        log_level=args.log_level,
+        log_format=args.log_format,
+        log_async=not args.log_sync,
+        log_sample_rates=args.log_sample_rates,
+        log_queue_size=args.log_queue_size,
+    )
+    log_file = open("services.log", "w")
+    stack.configure_logging(log_settings, stream=SlowStream(log_file, args.log_write_latency_ms))
+    stack.start()
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stack.api.app), base_url="http://bench", timeout=30)
+
+    async def drive():
+        async with client:
+            return await drive_load(client, args.requests, args.concurrency, stack.api.settings.api_token)
+
+    try:
+        load = asyncio.run(drive())
+        wait_for_delivery(stack.s3, load["sent_at"], args.delivery_timeout)
+        dropped_log_records = stack.dropped_log_records()
+    finally:
+        stack.stop()
+        stack.configure_logging(SimpleNamespace(**dict(vars(log_settings), log_async=False)), stream=sys.stderr)
+        log_file.close()
+
+    delivery = [stack.s3.put_times[m] - started for m, started in load["sent_at"].items() if m in stack.s3.put_times]
+    return {
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "requests": {
+            "total": args.requests,
+            "succeeded": len(load["sent_at"]),
+            "errors": load["errors"],
+            "elapsed_seconds": round(load["elapsed"], 3),
+            "requests_per_second": round(len(load["latencies"]) / load["elapsed"], 2) if load["elapsed"] else None,
+            "latency_ms": percentiles(load["latencies"]),
+        },
+        "delivery": {
+            "delivered": len(delivery),
+            "undelivered": len(load["sent_at"]) - len(delivery),
+            "end_to_end_ms": percentiles(delivery),
+        },
+        "worker": {
+            "messages_processed": stack.worker.messages_processed,
+            "messages_failed": stack.worker.messages_failed,
+        },
+        "sqs_calls": dict(stack.sqs.calls),
+        "log_bytes": os.path.getsize("services.log"),
+        "log_records_dropped": dropped_log_records,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """Describe how the headline numbers moved relative to a previous results file"""
+    rows = [
+        ("requests/sec", ("requests", "requests_per_second")),
+        ("latency p50 ms", ("requests", "latency_ms", "p50")),
+        ("latency p95 ms", ("requests", "latency_ms", "p95")),
+        ("latency p99 ms", ("requests", "latency_ms", "p99")),
+        ("end-to-end p50 ms", ("delivery", "end_to_end_ms", "p50")),
+        ("end-to-end p95 ms", ("delivery", "end_to_end_ms", "p95")),
+    ]
+    lines = [f"vs {baseline.get('git_revision')} ({baseline.get('timestamp')}):"]
+    for label, path in rows:
+        current, previous = report, baseline
+        for key in path:
+            current = (current or {}).get(key)
+            previous = (previous or {}).get(key)
+        if current is None or not previous:
+            continue
+        lines.append(f"  {label:<18} {previous:>10} -> {current:>10} ({(current - previous) / previous * 100:+.1f}%)")
+    return lines
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Local end-to-end benchmark for the email API and worker")
+    parser.add_argument("--requests", type=int, default=500, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--sqs-latency-ms", type=float, default=5, help="Injected latency per SQS call")
+    parser.add_argument("--s3-latency-ms", type=float, default=20, help="Injected latency per S3 put")
+    parser.add_argument("--worker-poll-interval", type=float, default=1, help="Override POLL_INTERVAL_SECONDS")
+    parser.add_argument("--delivery-timeout", type=float, default=120, help="Seconds to wait for S3 delivery")
+    parser.add_argument("--log-level", default="INFO", help="Service log level while benchmarking")
+    parser.add_argument("--log-format", choices=["text", "json"], default="text", help="LOG_FORMAT for the services")
+    parser.add_argument("--log-sync", action="store_true", help="Write logs inline instead of via the queue handler")
+    parser.add_argument("--log-sample-rates", default="", help="LOG_SAMPLE_RATES, e.g. INFO=0.1")
+    parser.add_argument("--log-queue-size", type=int, default=10000, help="LOG_QUEUE_SIZE for the async log queue")
+    parser.add_argument("--log-write-latency-ms", type=float, default=0, help="Injected latency per log write")
+    parser.add_argument("--label", default="", help="Free-form label stored with the results")
+    parser.add_argument("--output", default="", help="Results file (default: results/<timestamp>-<rev>.json)")
+    parser.add_argument("--compare", default="", help="Previous results file to diff against")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    output = Path(args.output) if args.output else None
+
+    # the worker writes ./health and the API/worker mocks write ./uploads; keep them out of the tree
+    original_cwd = Path.cwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            report = run(args)
+        finally:
+            os.chdir(original_cwd)
+
+    if output is None:
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+        output = RESULTS_DIR / f"{stamp}-{report['git_revision']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    req = report["requests"]
+    print(f"requests/sec: {req['requests_per_second']}  errors: {sum(req['errors'].values())}")
+    print(f"latency ms    p50={req['latency_ms']['p50']} p95={req['latency_ms']['p95']} p99={req['latency_ms']['p99']}")
+    e2e = report["delivery"]["end_to_end_ms"]
+    undelivered = report["delivery"]["undelivered"]
+    print(f"end-to-end ms p50={e2e['p50']} p95={e2e['p95']} p99={e2e['p99']} (undelivered: {undelivered})")
+    print(f"results: {output}")
+    if args.compare:
+        with open(args.compare) as f:
+            print("\n".join(compare(report, json.load(f))))
+    return 0 if report["delivery"]["undelivered"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
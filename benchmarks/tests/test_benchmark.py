@@ -0,0 +1,57 @@
+import sys
+import json
+import signal
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from local_stack import LocalSQS  # noqa: E402
+from run_benchmark import main, percentiles  # noqa: E402
+
+
+def test_local_sqs_redelivers_after_visibility_timeout():
+    sqs = LocalSQS()
+    sqs.send_message(QueueUrl="q", MessageBody="hello")
+
+    first = sqs.receive_message(QueueUrl="q", VisibilityTimeout=0)["Messages"]
+    second = sqs.receive_message(QueueUrl="q")["Messages"]
+    sqs.delete_message(QueueUrl="q", ReceiptHandle=second[0]["ReceiptHandle"])
+
+    assert first[0]["MessageId"] == second[0]["MessageId"]
+    assert sqs.receive_message(QueueUrl="q") == {}
+
+
+def test_percentiles():
+    stats = percentiles([i / 1000 for i in range(1, 101)])
+    assert stats["p50"] == 51.0
+    assert stats["p99"] == 100.0
+
+
+def test_benchmark_end_to_end(tmp_path, monkeypatch):
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: None)
+    output = tmp_path / "result.json"
+
+    exit_code = main(
+        [
+            "--requests",
+            "20",
+            "--concurrency",
+            "4",
+            "--sqs-latency-ms",
+            "0",
+            "--s3-latency-ms",
+            "0",
+            "--worker-poll-interval",
+            "0.01",
+            "--output",
+            str(output),
+        ]
+    )
+
+    report = json.loads(output.read_text())
+    assert exit_code == 0
+    assert report["requests"]["succeeded"] == 20
+    assert report["delivery"]["delivered"] == 20
+    assert report["requests"]["latency_ms"]["p95"] is not None
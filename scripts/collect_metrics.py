@@ -0,0 +1,253 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+MAX_QUERIES_PER_CALL = 500
+DEFAULT_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "hometask-metrics"
+
+
+def metric(namespace, name, dimensions, stat="Average", period=300):
+    return {"namespace": namespace, "metric": name, "dimensions": dimensions, "stat": stat, "period": period}
+
+
+def default_metrics(prefix: str, lanes: List[str]) -> List[Dict[str, Any]]:
+    """Everything check_all_metrics.sh reported, plus the priority lane queues"""
+    cluster = f"{prefix}-cluster"
+    alb = {"LoadBalancer": f"{prefix}-alb"}
+    metrics = [
+        # ALB metrics
+        metric("AWS/ApplicationELB", "TargetResponseTime", alb),
+        metric("AWS/ApplicationELB", "HTTPCode_Target_5XX_Count", alb),
+    ]
+
+    # ECS API / Worker metrics
+    for service in ("api", "worker"):
+        dims = {"ClusterName": cluster, "ServiceName": f"{prefix}-{service}-service"}
+        metrics += [
+            metric("AWS/ECS", "CPUUtilization", dims),
+            metric("AWS/ECS", "MemoryUtilization", dims),
+            metric("AWS/ECS", "RunningTaskCount", dims, "Average", 60),
+        ]
+
+    # SQS metrics, main queue first then priority lanes
+    for queue in [f"{prefix}-queue"] + [f"{prefix}-{lane}-queue" for lane in lanes]:
+        dims = {"QueueName": queue}
+        metrics += [
+            metric("AWS/SQS", "ApproximateNumberOfMessagesVisible", dims),
+            metric("AWS/SQS", "ApproximateAgeOfOldestMessage", dims),
+            metric("AWS/SQS", "NumberOfMessagesReceived", dims, "Sum", 300),
+            metric("AWS/SQS", "NumberOfMessagesSent", dims, "Sum", 300),
+            metric("AWS/SQS", "ApproximateNumberOfMessagesDelayed", dims),
+        ]
+
+    # CI/CD metrics
+    build = {"Workflow": "build-and-push-ecr"}
+    deploy = {"Workflow": "deploy-ecs"}
+    metrics += [
+        metric("HomeTask/CICD", "BuildSuccess", build, "Sum", 60),
+        metric("HomeTask/CICD", "BuildFailure", build, "Sum", 60),
+        metric("HomeTask/CICD", "DeploySuccess", deploy, "Sum", 60),
+        metric("HomeTask/CICD", "DeployFailure", deploy, "Sum", 60),
+    ]
+    return metrics
+
+
+def build_queries(metrics: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "Id": f"m{i}",
+            "Label": f"{m['namespace']}::{m['metric']}",
+            "MetricStat": {
+                "Metric": {
+                    "Namespace": m["namespace"],
+                    "MetricName": m["metric"],
+                    "Dimensions": [{"Name": k, "Value": v} for k, v in m["dimensions"].items()],
+                },
+                "Period": m["period"],
+                "Stat": m["stat"],
+            },
+            "ReturnData": True,
+        }
+        for i, m in enumerate(metrics)
+    ]
+
+
+def fetch(client, queries: List[Dict[str, Any]], start: datetime, end: datetime) -> Dict[str, Dict[str, Any]]:
+    """Run GetMetricData in chunks of 500 queries, following NextToken; returns {Id: {timestamps, values}}"""
+    results = {}
+    for offset in range(0, len(queries), MAX_QUERIES_PER_CALL):
+        kwargs = {
+            "MetricDataQueries": queries[offset : offset + MAX_QUERIES_PER_CALL],
+            "StartTime": start,
+            "EndTime": end,
+            "ScanBy": "TimestampAscending",
+        }
+        while True:
+            response = client.get_metric_data(**kwargs)
+            for result in response.get("MetricDataResults", []):
+                entry = results.setdefault(result["Id"], {"timestamps": [], "values": [], "status": None})
+                entry["timestamps"] += [
+                    ts.isoformat() if hasattr(ts, "isoformat") else ts for ts in result.get("Timestamps", [])
+                ]
+                entry["values"] += result.get("Values", [])
+                entry["status"] = result.get("StatusCode")
+            token = response.get("NextToken")
+            if not token:
+                break
+            kwargs["NextToken"] = token
+    return results
+
+
+def summarize(metrics: List[Dict[str, Any]], results: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    rows = []
+    for i, m in enumerate(metrics):
+        data = results.get(f"m{i}", {"timestamps": [], "values": [], "status": None})
+        values = data["values"]
+        rows.append(
+            dict(
+                m,
+                datapoints=len(values),
+                latest=values[-1] if values else None,
+                minimum=min(values) if values else None,
+                maximum=max(values) if values else None,
+                average=sum(values) / len(values) if values else None,
+                status=data["status"],
+                timestamps=data["timestamps"],
+                values=values,
+            )
+        )
+    return rows
+
+
+def window(minutes: int, now: Optional[datetime] = None):
+    """Window ending at the current minute, so reruns within a minute share a cache entry"""
+    end = (now or datetime.now(timezone.utc)).replace(second=0, microsecond=0)
+    return end - timedelta(minutes=minutes), end
+
+
+class WindowCache:
+    """JSON file cache keyed by window bounds and the exact query set; entries for past windows are pruned on write"""
+
+    END_FORMAT = "%Y%m%dT%H%M%S"
+
+    def __init__(self, directory: Optional[Path]):
+        self.directory = directory
+
+    def _path(self, queries, start, end) -> Path:
+        digest = hashlib.sha256(json.dumps([queries, start.isoformat(), end.isoformat()], sort_keys=True).encode())
+        return self.directory / f"{end.strftime(self.END_FORMAT)}-{digest.hexdigest()[:32]}.json"
+
+    def get(self, queries, start, end):
+        if not self.directory:
+            return None
+        path = self._path(queries, start, end)
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def put(self, queries, start, end, results):
+        if not self.directory:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self._path(queries, start, end), "w") as f:
+            json.dump(results, f)
+        self.prune(start)
+
+    def prune(self, start):
+        """Drop entries whose window ended before `start`; they can never be hit again"""
+        cutoff = start.replace(tzinfo=None)
+        for path in self.directory.glob("*.json"):
+            try:
+                expired = datetime.strptime(path.name.partition("-")[0], self.END_FORMAT) < cutoff
+            except ValueError:
+                expired = True  # written before entries carried their window end
+            if expired:
+                path.unlink(missing_ok=True)
+
+
+def collect(client, metrics, start, end, cache: Optional[WindowCache] = None) -> List[Dict[str, Any]]:
+    cache = cache or WindowCache(None)
+    queries = build_queries(metrics)
+    results = cache.get(queries, start, end)
+    if results is None:
+        results = fetch(client, queries, start, end)
+        cache.put(queries, start, end, results)
+    return summarize(metrics, results)
+
+
+def format_number(value):
+    if value is None:
+        return "-"
+    return f"{value:.2f}" if isinstance(value, float) and not value.is_integer() else f"{value:.0f}"
+
+
+def render_table(rows: List[Dict[str, Any]], start: datetime, end: datetime) -> str:
+    header = ("NAMESPACE", "METRIC", "DIMENSIONS", "STAT", "PTS", "LATEST", "MIN", "MAX", "AVG")
+    table = [header]
+    for row in rows:
+        dims = ",".join(row["dimensions"].values())
+        table.append(
+            (
+                row["namespace"],
+                row["metric"],
+                dims,
+                f"{row['stat']}/{row['period']}s",
+                str(row["datapoints"]),
+                format_number(row["latest"]),
+                format_number(row["minimum"]),
+                format_number(row["maximum"]),
+                format_number(row["average"]),
+            )
+        )
+    widths = [max(len(r[i]) for r in table) for i in range(len(header))]
+    lines = [f"==> Using window {start.isoformat()} → {end.isoformat()}"]
+    lines += ["  ".join(cell.ljust(width) for cell, width in zip(r, widths)).rstrip() for r in table]
+    return "\n".join(lines)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Collect service, queue and CI/CD CloudWatch metrics in batched calls")
+    parser.add_argument("--prefix", default="igor-home-task-prod", help="Resource name prefix (<project>-<env>)")
+    parser.add_argument("--lanes", default="high,bulk", help="Priority lane queues to include (comma-separated)")
+    parser.add_argument("--minutes", type=int, default=30, help="Window length ending now")
+    parser.add_argument("--format", choices=["table", "json"], default="table")
+    parser.add_argument("--output", default="", help="Also write the report to this file")
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR), help="Per-window result cache")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--region", default=os.environ.get("AWS_REGION"))
+    return parser
+
+
+def main(argv=None, client=None) -> int:
+    args = build_parser().parse_args(argv)
+    if client is None:
+        import boto3
+
+        client = boto3.client("cloudwatch", region_name=args.region)
+
+    metrics = default_metrics(args.prefix, [lane for lane in args.lanes.split(",") if lane])
+    start, end = window(args.minutes)
+    cache = WindowCache(None if args.no_cache else Path(args.cache_dir))
+    rows = collect(client, metrics, start, end, cache)
+
+    if args.format == "json":
+        report = json.dumps({"start": start.isoformat(), "end": end.isoformat(), "metrics": rows}, indent=2)
+    else:
+        report = render_table(rows, start, end)
+    print(report)
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, "a") as f:
+            f.write(report + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
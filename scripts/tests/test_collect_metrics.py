@@ -0,0 +1,116 @@
+import sys
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from collect_metrics import (  # noqa: E402
+    WindowCache,
+    build_queries,
+    collect,
+    default_metrics,
+    main,
+    metric,
+    render_table,
+)
+
+START = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+END = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+
+class StubCloudWatch:
+    def __init__(self, page_size=None):
+        self.calls = []
+        self.page_size = page_size
+
+    def get_metric_data(self, MetricDataQueries, StartTime, EndTime, ScanBy, NextToken=None):
+        self.calls.append({"count": len(MetricDataQueries), "token": NextToken})
+        offset = int(NextToken or 0)
+        page = MetricDataQueries[offset : offset + self.page_size] if self.page_size else MetricDataQueries
+        response = {
+            "MetricDataResults": [
+                {
+                    "Id": q["Id"],
+                    "Timestamps": [START, END],
+                    "Values": [1.0, float(q["Id"][1:])],
+                    "StatusCode": "Complete",
+                }
+                for q in page
+            ]
+        }
+        if self.page_size and offset + self.page_size < len(MetricDataQueries):
+            response["NextToken"] = str(offset + self.page_size)
+        return response
+
+
+def test_default_metrics_cover_shell_script():
+    metrics = default_metrics("igor-home-task-prod", [])
+
+    assert len(metrics) == 17
+    names = {(m["namespace"], m["metric"]) for m in metrics}
+    assert ("AWS/ApplicationELB", "TargetResponseTime") in names
+    assert ("HomeTask/CICD", "DeployFailure") in names
+
+
+def test_collect_batches_500_queries_per_call():
+    client = StubCloudWatch()
+    metrics = [metric("AWS/SQS", "NumberOfMessagesSent", {"QueueName": f"q{i}"}, "Sum") for i in range(1201)]
+
+    rows = collect(client, metrics, START, END)
+
+    assert [call["count"] for call in client.calls] == [500, 500, 201]
+    assert rows[1200]["latest"] == 1200.0
+    assert rows[0]["datapoints"] == 2
+
+
+def test_collect_follows_next_token():
+    client = StubCloudWatch(page_size=4)
+    metrics = default_metrics("p", [])
+
+    rows = collect(client, metrics, START, END)
+
+    assert len(client.calls) == 5
+    assert all(row["status"] == "Complete" for row in rows)
+
+
+def test_cache_reuses_window(tmp_path):
+    client = StubCloudWatch()
+    metrics = default_metrics("p", ["high"])
+    cache = WindowCache(tmp_path)
+
+    first = collect(client, metrics, START, END, cache)
+    second = collect(client, metrics, START, END, cache)
+
+    assert len(client.calls) == 1
+    assert first == second
+    assert "ApproximateAgeOfOldestMessage" in render_table(second, START, END)
+
+
+def test_cache_prunes_windows_older_than_current(tmp_path):
+    client = StubCloudWatch()
+    metrics = default_metrics("p", [])
+    cache = WindowCache(tmp_path)
+    (tmp_path / "legacy.json").write_text("{}")
+
+    collect(client, metrics, START, END, cache)
+    collect(client, metrics[:3], START, END, cache)
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+    later = timedelta(minutes=45)
+    collect(client, metrics, START + later, END + later, cache)
+
+    assert len(list(tmp_path.glob("*.json"))) == 1
+    assert cache.get(build_queries(metrics), START + later, END + later) is not None
+
+
+def test_main_json_report(tmp_path, capsys):
+    client = StubCloudWatch()
+
+    assert main(["--format", "json", "--no-cache", "--lanes", ""], client=client) == 0
+
+    report = json.loads(capsys.readouterr().out)
+    assert len(report["metrics"]) == 17
+    assert len(client.calls) == 1
@@ -5,11 +5,12 @@ import uuid
 import logging
 import json
 import boto3
-from typing import Optional, Dict, Any
-from config import settings
+from typing import Optional, Dict, Any, Literal
+from config import settings, PRIORITY_LANES
+from log_config import configure_logging
 
 # Configure logging
-logging.basicConfig(level=settings.log_level)
+configure_logging(settings)
 logger = logging.getLogger(__name__)
 
 # Initialize AWS SQS client (will use mock if configured)
@@ -52,6 +53,7 @@ class EmailData(BaseModel):
 class EmailRequest(BaseModel):
     data: EmailData
     token: str
+    priority: Optional[Literal["high", "normal", "bulk"]] = None
 
 
 class EmailResponse(BaseModel):
@@ -59,6 +61,7 @@ class EmailResponse(BaseModel):
     message_id: str
     timestamp: str
     queue_url: Optional[str] = None
+    priority: str = "normal"
 
 
 class HealthResponse(BaseModel):
@@ -86,38 +89,55 @@ class ConfigResponse(BaseModel):
 
 
 def verify_token(token: str) -> bool:
-    return token == settings.api_token
+    return token == settings.api_token or token in settings.token_lanes()
 
 
-def publish_to_sqs(message: Dict[str, Any], message_id: str) -> bool:
+def resolve_priority(request: EmailRequest) -> str:
+    """
+    Pick the lane for a request
+
+    A token listed in TOKEN_PRIORITY_POLICY defaults to its lane and can only
+    ask for that lane or a lower one, so bulk clients cannot jump the queue.
+    """
+    token_lane = settings.token_lanes().get(request.token)
+    if token_lane is None:
+        return request.priority or "normal"
+    if request.priority is None:
+        return token_lane
+    return max(request.priority, token_lane, key=PRIORITY_LANES.index)
+
+
+def publish_to_sqs(message: Dict[str, Any], message_id: str, priority: str = "normal") -> bool:
     try:
         if settings.use_mock_sqs:
             log_entry = {
                 "timestamp": datetime.utcnow().isoformat() + "Z",
                 "operation": "SQS_MOCK_PUBLISH",
                 "message_id": message_id,
+                "priority": priority,
                 "sender": message.get("data", {}).get("email_sender"),
                 "subject": message.get("data", {}).get("email_subject"),
                 "body": message,
             }
-            print("\n" + "=" * 80)
-            print("SQS MESSAGE PUBLISHED (MOCK)")
-            print("=" * 80)
-            print(json.dumps(log_entry, indent=2))
-            print("=" * 80 + "\n")
-            logger.info(f"Mock SQS: Message published {message_id}")
+            logger.info("Mock SQS: Message published %s", message_id, extra={"sqs_message": log_entry})
             return True
 
         response = sqs_client.send_message(
-            QueueUrl=settings.sqs_queue_url,
+            QueueUrl=settings.queue_url_for(priority),
             MessageBody=json.dumps(message),
             MessageAttributes={
                 "message_id": {"StringValue": message_id, "DataType": "String"},
+                "priority": {"StringValue": priority, "DataType": "String"},
                 "sender": {"StringValue": message.get("data", {}).get("email_sender"), "DataType": "String"},
                 "subject": {"StringValue": message.get("data", {}).get("email_subject"), "DataType": "String"},
             },
         )
-        logger.info(f"Message published to SQS: {response.get('MessageId')}")
+        logger.info(
+            "Message published to SQS (%s): %s",
+            priority,
+            response.get("MessageId"),
+            extra={"sampled": True, "message_id": message_id, "priority": priority},
+        )
         return True
 
     except Exception as e:
@@ -157,22 +177,34 @@ async def send_email(request: EmailRequest):
 
         message_id = f"msg_{uuid.uuid4().hex[:16]}"
         timestamp = datetime.utcnow().isoformat() + "Z"
+        priority = resolve_priority(request)
 
-        sqs_message = {"message_id": message_id, "timestamp": timestamp, "data": request.data.model_dump()}
+        sqs_message = {
+            "message_id": message_id,
+            "timestamp": timestamp,
+            "priority": priority,
+            "data": request.data.model_dump(),
+        }
 
-        if not publish_to_sqs(sqs_message, message_id):
+        if not publish_to_sqs(sqs_message, message_id, priority):
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to publish message to queue",
             )
 
-        logger.info(f"Email received and queued: {message_id} from {request.data.email_sender}")
+        logger.info(
+            "Email received and queued: %s from %s",
+            message_id,
+            request.data.email_sender,
+            extra={"sampled": True, "message_id": message_id, "priority": priority},
+        )
 
         return EmailResponse(
             status="accepted",
             message_id=message_id,
             timestamp=timestamp,
-            queue_url=settings.sqs_queue_url if not settings.use_mock_sqs else None,
+            queue_url=settings.queue_url_for(priority) if not settings.use_mock_sqs else None,
+            priority=priority,
         )
 
     except HTTPException as e:
@@ -206,4 +238,3 @@ if __name__ == "__main__":
         port=settings.api_port,
         log_level=settings.log_level.lower(),
     )
-
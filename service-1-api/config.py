@@ -1,6 +1,21 @@
+from pydantic import PrivateAttr
 from pydantic_settings import BaseSettings
+from typing import Dict
 import os
 
+# Highest priority first; "normal" is served by SQS_QUEUE_URL
+PRIORITY_LANES = ("high", "normal", "bulk")
+
+
+def parse_mapping(value: str) -> Dict[str, str]:
+    """Parse "key=value,key=value" environment strings"""
+    mapping = {}
+    for item in value.split(","):
+        key, sep, val = item.strip().partition("=")
+        if sep and key.strip() and val.strip():
+            mapping[key.strip()] = val.strip()
+    return mapping
+
 
 class Settings(BaseSettings):
     # API Configuration
@@ -16,6 +31,10 @@ class Settings(BaseSettings):
     sqs_queue_url: str = os.getenv("SQS_QUEUE_URL", "")
     use_mock_sqs: bool = os.getenv("USE_MOCK_SQS", "true").lower() == "true"
 
+    # Priority Lanes
+    sqs_priority_queue_urls: str = os.getenv("SQS_PRIORITY_QUEUE_URLS", "")  # high=<url>,bulk=<url>
+    token_priority_policy: str = os.getenv("TOKEN_PRIORITY_POLICY", "")  # <token>=<lane>, delivered as a secret
+
     # Email Validation
     max_email_subject_length: int = 255
     max_email_sender_length: int = 255
@@ -24,10 +43,32 @@ class Settings(BaseSettings):
 
     # Logging
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    log_format: str = os.getenv("LOG_FORMAT", "text")  # text | json
+    log_async: bool = os.getenv("LOG_ASYNC", "true").lower() == "true"
+    log_sample_rates: str = os.getenv("LOG_SAMPLE_RATES", "")  # INFO=0.1,DEBUG=0.01
+    log_queue_size: int = int(os.getenv("LOG_QUEUE_SIZE", 10000))  # LOG_ASYNC backlog limit
 
     class Config:
         env_file = ".env"
 
+    # Parsed once at load; these are read on every request
+    _lane_queue_urls: Dict[str, str] = PrivateAttr(default_factory=dict)
+    _token_lanes: Dict[str, str] = PrivateAttr(default_factory=dict)
 
-settings = Settings()
+    def model_post_init(self, __context) -> None:
+        self._lane_queue_urls = parse_mapping(self.sqs_priority_queue_urls)
+        self._token_lanes = {
+            token: lane for token, lane in parse_mapping(self.token_priority_policy).items() if lane in PRIORITY_LANES
+        }
 
+    def queue_url_for(self, lane: str) -> str:
+        """Queue URL for a lane, falling back to the main queue when the lane has none"""
+        if lane == "normal":
+            return self.sqs_queue_url
+        return self._lane_queue_urls.get(lane, self.sqs_queue_url)
+
+    def token_lanes(self) -> Dict[str, str]:
+        return self._token_lanes
+
+
+settings = Settings()
@@ -1,4 +1,5 @@
 import sys
+import logging
 from pathlib import Path
 import pytest
 from datetime import datetime, timedelta
@@ -8,7 +9,9 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.append(str(ROOT_DIR))
 
+import app as app_module  # noqa: E402
 from app import app, settings  # noqa: E402
+from config import Settings  # noqa: E402
 
 client = TestClient(app)
 
@@ -34,6 +37,21 @@ class TestEmailEndpoint:
         assert "message_id" in data
         assert data["message_id"].startswith("msg_")
 
+    def test_mock_publish_is_logged(self, valid_email, caplog):
+        with caplog.at_level(logging.INFO, logger="app"):
+            response = client.post("/send-email", json=valid_email)
+        assert response.status_code == 200
+        message_id = response.json()["message_id"]
+
+        records = [r for r in caplog.records if r.getMessage() == f"Mock SQS: Message published {message_id}"]
+        assert len(records) == 1
+        entry = records[0].sqs_message
+        assert entry["operation"] == "SQS_MOCK_PUBLISH"
+        assert entry["message_id"] == message_id
+        assert entry["priority"] == "normal"
+        assert entry["subject"] == "Test Subject"
+        assert entry["body"]["data"]["email_content"] == "This is test content"
+
     def test_invalid_token(self, valid_email):
         valid_email["token"] = "wrong_token"
         response = client.post("/send-email", json=valid_email)
@@ -100,3 +118,36 @@ class TestEmailEndpoint:
         assert data["max_email_content_length"] == 5000
         assert data["max_timestamp_age_days"] == 7
 
+    def test_default_priority(self, valid_email):
+        response = client.post("/send-email", json=valid_email)
+        assert response.status_code == 200
+        assert response.json()["priority"] == "normal"
+
+    def test_requested_priority(self, valid_email):
+        valid_email["priority"] = "high"
+        response = client.post("/send-email", json=valid_email)
+        assert response.status_code == 200
+        assert response.json()["priority"] == "high"
+
+    def test_invalid_priority(self, valid_email):
+        valid_email["priority"] = "urgent"
+        response = client.post("/send-email", json=valid_email)
+        assert response.status_code == 422
+
+    def test_token_policy_caps_priority(self, valid_email, monkeypatch):
+        monkeypatch.setattr(app_module, "settings", Settings(token_priority_policy="backfill_token=bulk"))
+        valid_email["token"] = "backfill_token"
+        valid_email["priority"] = "high"
+        response = client.post("/send-email", json=valid_email)
+        assert response.status_code == 200
+        assert response.json()["priority"] == "bulk"
+
+    def test_queue_url_for_lane(self):
+        lanes = Settings(sqs_queue_url="https://sqs.local/main", sqs_priority_queue_urls="high=https://sqs.local/high")
+        assert lanes.queue_url_for("high") == "https://sqs.local/high"
+        assert lanes.queue_url_for("normal") == "https://sqs.local/main"
+        assert lanes.queue_url_for("bulk") == "https://sqs.local/main"
+
+    def test_token_policy_ignores_unknown_lanes(self):
+        policy = Settings(token_priority_policy="a=bulk,b=urgent,c")
+        assert policy.token_lanes() == {"a": "bulk"}
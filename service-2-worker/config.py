@@ -1,15 +1,33 @@
 from pydantic_settings import BaseSettings
+from typing import Dict
 import os
 
 
+def parse_mapping(value: str) -> Dict[str, str]:
+    """Parse "key=value,key=value" environment strings"""
+    mapping = {}
+    for item in value.split(","):
+        key, sep, val = item.strip().partition("=")
+        if sep and key.strip() and val.strip():
+            mapping[key.strip()] = val.strip()
+    return mapping
+
+
 class WorkerSettings(BaseSettings):
     # Worker Configuration
     poll_interval_seconds: int = int(os.getenv("POLL_INTERVAL_SECONDS", 10))
     max_messages_per_poll: int = 10
     visibility_timeout: int = 60
+    drain_timeout_seconds: int = int(os.getenv("DRAIN_TIMEOUT_SECONDS", 20))
+    receive_wait_time_seconds: int = int(os.getenv("RECEIVE_WAIT_TIME_SECONDS", 20))
     use_mock_sqs: bool = os.getenv("USE_MOCK_SQS", "true").lower() == "true"
     sqs_endpoint_url: str = os.getenv("SQS_ENDPOINT_URL", "")
 
+    # Priority Lanes
+    sqs_priority_queue_urls: str = os.getenv("SQS_PRIORITY_QUEUE_URLS", "")  # high=<url>,bulk=<url>
+    priority_weights: str = os.getenv("PRIORITY_WEIGHTS", "high=6,normal=3,bulk=1")
+    lane_wait_time_seconds: int = int(os.getenv("LANE_WAIT_TIME_SECONDS", 1))
+
     # AWS Configuration
     aws_region: str = os.getenv("AWS_REGION", "us-east-1")
     sqs_queue_url: str = os.getenv("SQS_QUEUE_URL", "")
@@ -24,10 +42,23 @@ class WorkerSettings(BaseSettings):
 
     # Logging
     log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    log_format: str = os.getenv("LOG_FORMAT", "text")  # text | json
+    log_async: bool = os.getenv("LOG_ASYNC", "true").lower() == "true"
+    log_sample_rates: str = os.getenv("LOG_SAMPLE_RATES", "")  # INFO=0.1,DEBUG=0.01
+    log_queue_size: int = int(os.getenv("LOG_QUEUE_SIZE", 10000))  # LOG_ASYNC backlog limit
 
     class Config:
         env_file = ".env"
 
+    def lane_queue_urls(self) -> Dict[str, str]:
+        """Lane -> queue URL; the main queue is always the "normal" lane"""
+        lanes = {"normal": self.sqs_queue_url}
+        lanes.update(parse_mapping(self.sqs_priority_queue_urls))
+        return lanes
+
+    def lane_weights(self) -> Dict[str, int]:
+        weights = {lane: int(weight) for lane, weight in parse_mapping(self.priority_weights).items()}
+        return {lane: max(weights.get(lane, 1), 1) for lane in self.lane_queue_urls()}
 
-settings = WorkerSettings()
 
+settings = WorkerSettings()
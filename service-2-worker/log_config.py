@@ -0,0 +1,139 @@
+import atexit
+import logging
+import queue
+import random
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from pythonjsonlogger import jsonlogger
+from config import parse_mapping
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+JSON_FORMAT = "%(asctime)s %(name)s %(levelname)s %(message)s"
+
+# QueueListener and handler set up by the last configure_logging call in LOG_ASYNC mode
+_listener: Optional[QueueListener] = None
+_handler: Optional["DeferredQueueHandler"] = None
+
+
+class LevelSampler(logging.Filter):
+    """
+    Keep a fraction of high-volume success records, per level
+
+    Only records logged with extra={"sampled": True} are subject to sampling;
+    warnings, errors and ordinary records always pass.
+    """
+
+    def __init__(self, rates: Dict[int, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False):
+            return True
+        rate = self.rates.get(record.levelno, 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+def parse_sample_rates(value: str) -> Dict[int, float]:
+    """Parse "INFO=0.1,DEBUG=0.01" into {logging.INFO: 0.1, logging.DEBUG: 0.01}"""
+    rates = {}
+    for level, rate in parse_mapping(value).items():
+        levelno = logging.getLevelName(level.upper())
+        if isinstance(levelno, int):
+            rates[levelno] = float(rate)
+    return rates
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Enqueue records untouched for the listener thread to format and write
+
+    QueueHandler.prepare() formats the message (and any traceback) on the
+    caller's thread; records stay in-process here, so that is skipped. The
+    queue is bounded: when it is full, sampled success records are dropped
+    and counted, and everything else waits for room.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if not getattr(record, "sampled", False):
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1  # emit() runs under the handler lock
+
+
+class BlockingQueueListener(QueueListener):
+    """QueueListener whose stop sentinel waits for room in a bounded queue"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+def dropped_records() -> int:
+    """Sampled records dropped because the log queue was full, since logging was last configured"""
+    return _handler.dropped if _handler is not None else 0
+
+
+def stop_logging():
+    """Flush queued records, stop the background listener and write any later records inline"""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    root = logging.getLogger()
+    if _handler in root.handlers:
+        root.removeHandler(_handler)
+        for output in listener.handlers:
+            root.addHandler(output)
+
+
+atexit.register(stop_logging)
+
+
+def configure_logging(settings, stream=None) -> Optional[QueueListener]:
+    """
+    Configure the root logger from LOG_LEVEL / LOG_FORMAT / LOG_ASYNC / LOG_SAMPLE_RATES
+
+    With LOG_ASYNC the caller only filters and enqueues records; message
+    formatting and the write to the stream happen on a background
+    QueueListener thread. The queue holds at most LOG_QUEUE_SIZE records.
+    """
+    global _listener, _handler
+    stop_logging()
+    _handler = None
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    if settings.log_format == "json":
+        output.setFormatter(jsonlogger.JsonFormatter(JSON_FORMAT))
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    sampler = LevelSampler(parse_sample_rates(settings.log_sample_rates))
+    root.setLevel(settings.log_level)
+
+    if not settings.log_async:
+        output.addFilter(sampler)
+        root.addHandler(output)
+        return None
+
+    listener = BlockingQueueListener(queue.Queue(maxsize=settings.log_queue_size), output)
+    queue_handler = DeferredQueueHandler(listener.queue)
+    queue_handler.addFilter(sampler)
+    root.addHandler(queue_handler)
+    listener.start()
+    _listener, _handler = listener, queue_handler
+    return listener
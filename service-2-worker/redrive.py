@@ -0,0 +1,425 @@
+import argparse
+import json
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Optional
+import boto3
+from config import settings
+from worker import S3Uploader
+
+logger = logging.getLogger("dlq-redrive")
+
+SQS_BATCH_SIZE = 10
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.rstrip("Z"))
+    if parsed.tzinfo:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def unwrap_envelope(message: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Unwrap a DLQ message into {body, error, error_class, timestamp}
+
+    Messages written by SQSConsumer.send_to_dlq carry an
+    {original_message, error, timestamp} envelope; anything else (e.g. moved
+    by the native redrive policy) is passed through with no error metadata.
+    """
+    raw = message["Body"]
+    try:
+        envelope = json.loads(raw)
+    except json.JSONDecodeError:
+        envelope = None
+
+    if isinstance(envelope, dict) and "original_message" in envelope:
+        error = envelope.get("error") or ""
+        return {
+            "body": envelope.get("original_message"),
+            "error": error,
+            "error_class": error.split(":", 1)[0].strip() if error else None,
+            "timestamp": parse_timestamp(envelope.get("timestamp")),
+        }
+
+    return {"body": raw, "error": None, "error_class": None, "timestamp": None}
+
+
+class RedriveFilter:
+    """Select DLQ messages by error class and failure time"""
+
+    def __init__(self, error_classes=None, since: Optional[datetime] = None, until: Optional[datetime] = None):
+        self.error_classes = {c.lower() for c in error_classes or []}
+        self.since = since
+        self.until = until
+
+    def matches(self, unwrapped: Dict[str, Any]) -> bool:
+        if self.error_classes:
+            error_class = (unwrapped["error_class"] or "").lower()
+            if error_class not in self.error_classes:
+                return False
+
+        timestamp = unwrapped["timestamp"]
+        if (self.since or self.until) and timestamp is None:
+            return False
+        if self.since and timestamp < self.since:
+            return False
+        if self.until and timestamp > self.until:
+            return False
+        return True
+
+
+class RateLimiter:
+    """Thread-safe limiter spacing acquisitions to at most `rate` items per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self.next_slot = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, count: int = 1):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start = max(self.next_slot, now)
+            self.next_slot = start + self.interval * count
+        if start > now:
+            time.sleep(start - now)
+
+
+class Checkpoint:
+    """
+    Persist DLQ message ids that were already re-published so a rerun can resume
+
+    The file is JSON Lines, one message id per line; each batch appends only
+    its own ids, so the cost of a mark does not grow with the checkpoint.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = Path(path) if path else None
+        self.lock = threading.Lock()
+        self.done = set()
+        if self.path and self.path.exists():
+            with open(self.path) as f:
+                lines = f.read().split("\n")
+            for line in filter(None, lines):
+                try:
+                    self.done.add(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # a line cut short by an interrupted run
+            if lines[-1]:
+                # terminate the partial line so the next append starts cleanly
+                with open(self.path, "a") as f:
+                    f.write("\n")
+            logger.info(f"Loaded checkpoint with {len(self.done)} message(s) from {self.path}")
+
+    def __contains__(self, message_id: str) -> bool:
+        with self.lock:
+            return message_id in self.done
+
+    def mark(self, message_ids):
+        message_ids = list(message_ids)
+        if not message_ids:
+            return
+        with self.lock:
+            self.done.update(message_ids)
+            if not self.path:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write("".join(json.dumps(message_id) + "\n" for message_id in message_ids))
+
+
+class DLQRedriver:
+    """Drain the DLQ with concurrent receivers and replay messages to SQS or S3"""
+
+    def __init__(
+        self,
+        settings,
+        target_queue_url: Optional[str] = None,
+        to_s3: bool = False,
+        redrive_filter: Optional[RedriveFilter] = None,
+        receivers: int = 4,
+        rate: float = 0,
+        checkpoint: Optional[Checkpoint] = None,
+        dry_run: bool = False,
+        max_empty_receives: int = 2,
+        sqs_client=None,
+        s3_uploader: Optional[S3Uploader] = None,
+    ):
+        self.settings = settings
+        self.dlq_url = settings.dlq_queue_url
+        self.target_queue_url = target_queue_url or settings.sqs_queue_url
+        # replay each message onto the lane it was published to; the target queue serves "normal"
+        self.lane_queue_urls = dict(settings.lane_queue_urls(), normal=self.target_queue_url)
+        self.to_s3 = to_s3
+        self.filter = redrive_filter or RedriveFilter()
+        self.receivers = receivers
+        self.rate_limiter = RateLimiter(rate)
+        self.checkpoint = checkpoint or Checkpoint(None)
+        self.dry_run = dry_run
+        self.max_empty_receives = max_empty_receives
+        endpoint = settings.sqs_endpoint_url or None
+        self.sqs_client = sqs_client or boto3.client("sqs", region_name=settings.aws_region, endpoint_url=endpoint)
+        self.s3 = s3_uploader if s3_uploader is not None else (S3Uploader(settings) if to_s3 else None)
+
+        self.stats = {"received": 0, "redriven": 0, "skipped": 0, "resumed": 0, "failed": 0, "released": 0}
+        self.stats_lock = threading.Lock()
+        # MessageId -> message received but left in the DLQ; handed back once the receivers finish
+        self.held = {}
+
+    def _count(self, key: str, amount: int = 1):
+        if amount:
+            with self.stats_lock:
+                self.stats[key] += amount
+
+    def _receive(self) -> list:
+        response = self.sqs_client.receive_message(
+            QueueUrl=self.dlq_url,
+            MaxNumberOfMessages=SQS_BATCH_SIZE,
+            WaitTimeSeconds=2,
+            VisibilityTimeout=max(self.settings.visibility_timeout, 300),
+        )
+        return response.get("Messages", [])
+
+    def _hold(self, messages: list):
+        if messages:
+            with self.stats_lock:
+                self.held.update((message["MessageId"], message) for message in messages)
+
+    def _unseen(self, messages: list) -> list:
+        """
+        Drop messages already handled this run
+
+        A held message becomes visible again once its visibility timeout runs
+        out in a long run; it is not counted twice, but its new receipt handle
+        replaces the stale one so it can still be released.
+        """
+        unseen = []
+        with self.stats_lock:
+            for message in messages:
+                if message["MessageId"] in self.held:
+                    self.held[message["MessageId"]] = message
+                else:
+                    unseen.append(message)
+        return unseen
+
+    def _release_held(self):
+        """Make skipped, dry-run and failed messages visible in the DLQ again right away"""
+        held = list(self.held.values())
+        for start in range(0, len(held), SQS_BATCH_SIZE):
+            chunk = held[start : start + SQS_BATCH_SIZE]
+            entries = [
+                {"Id": str(i), "ReceiptHandle": message["ReceiptHandle"], "VisibilityTimeout": 0}
+                for i, message in enumerate(chunk)
+            ]
+            try:
+                response = self.sqs_client.change_message_visibility_batch(QueueUrl=self.dlq_url, Entries=entries)
+                self._count("released", len(response.get("Successful", [])))
+                for failure in response.get("Failed", []):
+                    logger.warning(f"Failed to release DLQ message {failure.get('Id')}: {failure.get('Message')}")
+
+            except Exception as e:
+                logger.error(f"Failed to release DLQ messages: {str(e)}")
+        self.held = {}
+
+    def _delete(self, messages: list) -> list:
+        """Delete messages from the DLQ and return the ones that are still there"""
+        if not messages or self.dry_run:
+            return []
+        try:
+            response = self.sqs_client.delete_message_batch(
+                QueueUrl=self.dlq_url,
+                Entries=[{"Id": str(i), "ReceiptHandle": m["ReceiptHandle"]} for i, m in enumerate(messages)],
+            )
+        except Exception as e:
+            logger.error(f"Failed to delete DLQ messages: {str(e)}")
+            return list(messages)
+        for failure in response.get("Failed", []):
+            logger.warning(f"Failed to delete DLQ message {failure.get('Id')}: {failure.get('Message')}")
+        return [messages[int(failure["Id"])] for failure in response.get("Failed", [])]
+
+    def _publish(self, batch: list) -> list:
+        """Send a chunk to its lane queues and return the DLQ messages that succeeded"""
+        lanes = {}
+        for i, (message, unwrapped) in enumerate(batch):
+            entry = {"Id": str(i), "MessageBody": unwrapped["body"]}
+            try:
+                body = json.loads(unwrapped["body"])
+                message_id, lane = body.get("message_id"), body.get("priority")
+            except (ValueError, AttributeError):
+                message_id, lane = None, None
+            attributes = {}
+            if message_id:
+                attributes["message_id"] = {"StringValue": message_id, "DataType": "String"}
+            if lane:
+                attributes["priority"] = {"StringValue": lane, "DataType": "String"}
+            if attributes:
+                entry["MessageAttributes"] = attributes
+            queue_url = self.lane_queue_urls.get(lane) or self.target_queue_url
+            lanes.setdefault(queue_url, []).append(entry)
+
+        published = []
+        for queue_url, entries in lanes.items():
+            response = self.sqs_client.send_message_batch(QueueUrl=queue_url, Entries=entries)
+            for failure in response.get("Failed", []):
+                logger.error(f"Failed to re-publish entry {failure.get('Id')} to {queue_url}: {failure.get('Message')}")
+            published += [batch[int(success["Id"])][0] for success in response.get("Successful", [])]
+        return published
+
+    def _upload(self, batch: list) -> list:
+        uploaded = []
+        for message, unwrapped in batch:
+            try:
+                body = json.loads(unwrapped["body"])
+            except (TypeError, json.JSONDecodeError) as e:
+                logger.error(f"Cannot upload {message['MessageId']} to S3, body is not JSON: {str(e)}")
+                continue
+            if self.s3.upload_email(body, body.get("message_id", message["MessageId"])):
+                uploaded.append(message)
+        return uploaded
+
+    def _handle_batch(self, messages: list):
+        messages = self._unseen(messages)
+        self._count("received", len(messages))
+
+        resumed = []
+        skipped = []
+        pending = []
+        for message in messages:
+            if message["MessageId"] in self.checkpoint:
+                resumed.append(message)
+                continue
+            unwrapped = unwrap_envelope(message)
+            if unwrapped["body"] is None or not self.filter.matches(unwrapped):
+                skipped.append(message)
+                continue
+            pending.append((message, unwrapped))
+
+        self._count("skipped", len(skipped))
+        self._hold(skipped)
+        self._count("resumed", len(resumed))
+        if self.dry_run:
+            self._hold(resumed + [message for message, _ in pending])
+            self._count("redriven", len(pending))
+            return
+        undeleted = self._delete(resumed)
+        self._hold(undeleted)
+        self._count("failed", len(undeleted))
+
+        if not pending:
+            return
+
+        self.rate_limiter.acquire(len(pending))
+        try:
+            done = self._upload(pending) if self.to_s3 else self._publish(pending)
+        except Exception as e:
+            logger.error(f"Failed to redrive batch: {str(e)}")
+            done = []
+
+        # checkpointed before the delete, so a message left in the DLQ is resumed rather than re-published next run
+        self.checkpoint.mark(m["MessageId"] for m in done)
+        undeleted = self._delete(done)
+        deleted_ids = {m["MessageId"] for m in done} - {m["MessageId"] for m in undeleted}
+        self._hold([message for message, _ in pending if message["MessageId"] not in deleted_ids])
+        self._count("redriven", len(deleted_ids))
+        self._count("failed", len(pending) - len(deleted_ids))
+
+    def _receiver_loop(self, index: int):
+        empty = 0
+        while empty < self.max_empty_receives:
+            try:
+                messages = self._receive()
+            except Exception as e:
+                logger.error(f"Receiver {index} failed to receive from DLQ: {str(e)}")
+                empty += 1
+                continue
+
+            if not messages:
+                empty += 1
+                continue
+
+            empty = 0
+            try:
+                self._handle_batch(messages)
+            except Exception as e:
+                logger.error(f"Receiver {index} failed to handle batch: {str(e)}")
+                self._hold(messages)
+                self._count("failed", len(messages))
+
+    def run(self) -> Dict[str, Any]:
+        target = "S3" if self.to_s3 else self.target_queue_url
+        logger.info(f"Redriving {self.dlq_url} -> {target} with {self.receivers} receiver(s)")
+        started = time.monotonic()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.receivers) as pool:
+                for future in [pool.submit(self._receiver_loop, i) for i in range(self.receivers)]:
+                    future.result()
+        finally:
+            self._release_held()
+
+        report = dict(self.stats, elapsed_seconds=round(time.monotonic() - started, 3), dry_run=self.dry_run)
+        logger.info(f"Redrive finished: {report}")
+        return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Replay messages from the email DLQ")
+    parser.add_argument(
+        "--target-queue-url",
+        default=settings.sqs_queue_url,
+        help="Queue to re-publish to; messages with a priority lane go to that lane's queue",
+    )
+    parser.add_argument("--to-s3", action="store_true", help="Upload straight to S3 instead of re-publishing")
+    parser.add_argument(
+        "--error-class",
+        action="append",
+        default=[],
+        help="Only redrive this error class (repeatable), e.g. 'Processing error'",
+    )
+    parser.add_argument("--since", help="Only redrive messages that failed at or after this ISO timestamp")
+    parser.add_argument("--until", help="Only redrive messages that failed at or before this ISO timestamp")
+    parser.add_argument("--receivers", type=int, default=4, help="Concurrent DLQ receivers")
+    parser.add_argument("--rate", type=float, default=50, help="Max messages per second (0 = unlimited)")
+    parser.add_argument(
+        "--checkpoint", default="./redrive-checkpoint.jsonl", help="Checkpoint file (JSON Lines) used to resume"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Count matching messages without replaying or deleting")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if not settings.dlq_queue_url:
+        logger.error("DLQ_QUEUE_URL is not set")
+        return 1
+    if not args.to_s3 and not args.target_queue_url:
+        logger.error("No target queue: set SQS_QUEUE_URL, pass --target-queue-url or use --to-s3")
+        return 1
+
+    redriver = DLQRedriver(
+        settings,
+        target_queue_url=args.target_queue_url,
+        to_s3=args.to_s3,
+        redrive_filter=RedriveFilter(args.error_class, parse_timestamp(args.since), parse_timestamp(args.until)),
+        receivers=args.receivers,
+        rate=args.rate,
+        checkpoint=Checkpoint(None if args.dry_run else args.checkpoint),
+        dry_run=args.dry_run,
+    )
+    report = redriver.run()
+    print(json.dumps(report, indent=2))
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+import sys
+import json
+import threading
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from redrive import Checkpoint, DLQRedriver, RedriveFilter, unwrap_envelope  # noqa: E402
+from worker import settings  # noqa: E402
+
+DLQ_URL = "https://sqs.local/dlq"
+MAIN_URL = "https://sqs.local/main"
+HIGH_URL = "https://sqs.local/high"
+
+
+class InMemorySQS:
+    def __init__(self, messages):
+        self.queues = {DLQ_URL: list(messages), MAIN_URL: []}
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.send_batches = []
+        self.delete_errors = 0
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages, **kwargs):
+        with self.lock:
+            queue = self.queues[QueueUrl]
+            # hide received messages until deleted or released, like a long visibility timeout
+            batch, self.queues[QueueUrl] = queue[:MaxNumberOfMessages], queue[MaxNumberOfMessages:]
+            self.in_flight.update({m["ReceiptHandle"]: (QueueUrl, m) for m in batch})
+        return {"Messages": batch}
+
+    def expire_visibility(self):
+        """Make every in-flight message visible again with a fresh receipt handle"""
+        with self.lock:
+            for handle, (queue_url, message) in self.in_flight.items():
+                self.queues[queue_url].append(dict(message, ReceiptHandle=handle + "+"))
+            self.in_flight = {}
+
+    def change_message_visibility_batch(self, QueueUrl, Entries):
+        with self.lock:
+            for entry in Entries:
+                queue_url, message = self.in_flight.pop(entry["ReceiptHandle"])
+                self.queues[queue_url].append(message)
+        return {"Successful": [{"Id": e["Id"]} for e in Entries], "Failed": []}
+
+    def send_message_batch(self, QueueUrl, Entries):
+        with self.lock:
+            self.send_batches.append(Entries)
+            self.queues[QueueUrl].extend({"Body": e["MessageBody"]} for e in Entries)
+        return {"Successful": [{"Id": e["Id"]} for e in Entries], "Failed": []}
+
+    def delete_message_batch(self, QueueUrl, Entries):
+        with self.lock:
+            if self.delete_errors:
+                self.delete_errors -= 1
+                raise RuntimeError("Rate exceeded")
+            for entry in Entries:
+                self.in_flight.pop(entry["ReceiptHandle"], None)
+        return {"Successful": [{"Id": e["Id"]} for e in Entries], "Failed": []}
+
+
+def dlq_message(index, error="Processing error: boom", timestamp="2024-05-01T12:00:00Z", priority=None):
+    body = {"message_id": f"msg_{index}", "data": {"email_subject": "Hello"}}
+    if priority:
+        body["priority"] = priority
+    original = json.dumps(body)
+    envelope = {"original_message": original, "error": error, "timestamp": timestamp}
+    return {"MessageId": f"dlq_{index}", "ReceiptHandle": f"rh_{index}", "Body": json.dumps(envelope)}
+
+
+def make_redriver(sqs, lanes="", **kwargs):
+    dlq_settings = settings.model_copy(update={"dlq_queue_url": DLQ_URL, "sqs_priority_queue_urls": lanes})
+    return DLQRedriver(dlq_settings, target_queue_url=MAIN_URL, sqs_client=sqs, max_empty_receives=1, **kwargs)
+
+
+def test_unwrap_envelope_and_filter():
+    unwrapped = unwrap_envelope(dlq_message(1, error="Invalid JSON: Expecting value"))
+
+    assert json.loads(unwrapped["body"])["message_id"] == "msg_1"
+    assert unwrapped["error_class"] == "Invalid JSON"
+    assert RedriveFilter(["invalid json"]).matches(unwrapped)
+    assert not RedriveFilter(["Processing error"]).matches(unwrapped)
+    assert not RedriveFilter(since=unwrapped["timestamp"].replace(year=2025)).matches(unwrapped)
+
+
+def test_redrive_republishes_matching_messages_in_batches():
+    messages = [dlq_message(i) for i in range(15)] + [dlq_message(99, error="Invalid JSON: bad")]
+    sqs = InMemorySQS(messages)
+
+    report = make_redriver(sqs, redrive_filter=RedriveFilter(["Processing error"]), receivers=3).run()
+
+    assert report["redriven"] == 15
+    assert report["skipped"] == 1
+    assert all(len(batch) <= 10 for batch in sqs.send_batches)
+    bodies = {json.loads(m["Body"])["message_id"] for m in sqs.queues[MAIN_URL]}
+    assert bodies == {f"msg_{i}" for i in range(15)}
+
+
+def test_redrive_returns_messages_to_their_lane():
+    sqs = InMemorySQS(
+        [
+            dlq_message(0, priority="high"),
+            dlq_message(1, priority="normal"),
+            dlq_message(2),
+            dlq_message(3, priority="bulk"),
+        ]
+    )
+    sqs.queues[HIGH_URL] = []
+
+    report = make_redriver(sqs, lanes=f"high={HIGH_URL}", receivers=1).run()
+
+    assert report["redriven"] == 4
+    assert [json.loads(m["Body"])["message_id"] for m in sqs.queues[HIGH_URL]] == ["msg_0"]
+    # no bulk queue configured, so bulk falls back to the target queue with the unlabelled messages
+    assert [json.loads(m["Body"])["message_id"] for m in sqs.queues[MAIN_URL]] == ["msg_1", "msg_2", "msg_3"]
+
+
+def test_checkpoint_resume_skips_already_published(tmp_path):
+    checkpoint_path = tmp_path / "checkpoint.jsonl"
+    Checkpoint(str(checkpoint_path)).mark(["dlq_0"])
+    Checkpoint(str(checkpoint_path)).mark(["dlq_1"])
+    with open(checkpoint_path, "a") as f:
+        f.write('"dlq_')  # interrupted mid-write
+    sqs = InMemorySQS([dlq_message(i) for i in range(3)])
+
+    report = make_redriver(sqs, checkpoint=Checkpoint(str(checkpoint_path)), receivers=1).run()
+
+    assert report["resumed"] == 2
+    assert report["redriven"] == 1
+    assert [json.loads(m["Body"])["message_id"] for m in sqs.queues[MAIN_URL]] == ["msg_2"]
+    assert Checkpoint(str(checkpoint_path)).done == {"dlq_0", "dlq_1", "dlq_2"}
+
+
+def test_redrive_to_s3_skips_main_queue(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    sqs = InMemorySQS([dlq_message(i) for i in range(2)])
+
+    report = make_redriver(sqs, to_s3=True).run()
+
+    assert report["redriven"] == 2
+    assert sqs.queues[MAIN_URL] == []
+    assert len(list((tmp_path / "uploads").rglob("msg_*.json"))) == 2
+
+
+def test_dry_run_and_skipped_messages_are_released():
+    messages = [dlq_message(i) for i in range(12)] + [dlq_message(99, error="Invalid JSON: bad")]
+    sqs = InMemorySQS(messages)
+
+    preview = make_redriver(sqs, dry_run=True, receivers=2).run()
+    assert preview["redriven"] == 13
+    assert preview["released"] == 13
+    assert sqs.queues[MAIN_URL] == []
+
+    first = make_redriver(sqs, redrive_filter=RedriveFilter(["Processing error"]), receivers=2).run()
+    second = make_redriver(sqs, redrive_filter=RedriveFilter(["Invalid JSON"]), receivers=2).run()
+
+    assert first["redriven"] == 12 and first["released"] == 1
+    assert second["redriven"] == 1
+    assert len(sqs.queues[MAIN_URL]) == 13
+    assert sqs.queues[DLQ_URL] == [] and sqs.in_flight == {}
+
+
+def test_resurfaced_held_messages_are_not_counted_twice():
+    sqs = InMemorySQS([dlq_message(i) for i in range(3)])
+    redriver = make_redriver(sqs, dry_run=True, receivers=1)
+    redriver._handle_batch(sqs.receive_message(DLQ_URL, 10)["Messages"])
+    # a long run outlives the visibility timeout, so the held messages come back
+    sqs.expire_visibility()
+
+    report = redriver.run()
+
+    assert report["received"] == 3 and report["redriven"] == 3
+    assert report["released"] == 3
+    assert len(sqs.queues[DLQ_URL]) == 3 and sqs.in_flight == {}
+
+
+def test_failed_delete_is_counted_and_released(tmp_path):
+    messages = [dlq_message(i, error="Invalid JSON: bad") for i in range(10)] + [dlq_message(i) for i in range(10, 15)]
+    sqs = InMemorySQS(messages)
+    sqs.delete_errors = 1
+    checkpoint_path = str(tmp_path / "checkpoint.jsonl")
+
+    report = make_redriver(
+        sqs, redrive_filter=RedriveFilter(["Processing error"]), checkpoint=Checkpoint(checkpoint_path), receivers=1
+    ).run()
+
+    assert report["skipped"] == 10
+    assert report["failed"] == 5 and report["redriven"] == 0
+    assert report["released"] == 15
+    assert len(sqs.queues[DLQ_URL]) == 15 and sqs.in_flight == {}
+
+    rerun = make_redriver(
+        sqs, redrive_filter=RedriveFilter(["Processing error"]), checkpoint=Checkpoint(checkpoint_path), receivers=1
+    ).run()
+    assert rerun["resumed"] == 5 and rerun["failed"] == 0
+    assert len(sqs.queues[MAIN_URL]) == 5
@@ -1,6 +1,11 @@
 import os
 import sys
+import io
 import json
+import logging
+import queue
+import signal
+import time
 from pathlib import Path
 from datetime import datetime
 import pytest
@@ -9,7 +14,9 @@ ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.append(str(ROOT_DIR))
 
-from worker import S3Uploader, settings  # noqa: E402
+import log_config  # noqa: E402
+from log_config import DeferredQueueHandler, configure_logging, dropped_records, stop_logging  # noqa: E402
+from worker import EmailWorker, S3Uploader, SQSConsumer, WeightedFairScheduler, settings  # noqa: E402
 
 
 @pytest.fixture
@@ -40,3 +47,240 @@ def test_mock_upload_creates_file(temp_cwd):
 
     assert saved["message_id"] == message_id
 
+
+class StubSQSClient:
+    def __init__(self, queues=None, broken=()):
+        self.queues = queues or {}
+        self.broken = set(broken)
+        self.visibility_batches = []
+        self.deleted_from = []
+
+    def receive_message(self, QueueUrl, MaxNumberOfMessages, **kwargs):
+        if QueueUrl in self.broken:
+            raise RuntimeError(f"AccessDenied: {QueueUrl}")
+        queue = self.queues.get(QueueUrl, [])
+        batch, self.queues[QueueUrl] = queue[:MaxNumberOfMessages], queue[MaxNumberOfMessages:]
+        return {"Messages": batch}
+
+    def delete_message(self, QueueUrl, ReceiptHandle):
+        self.deleted_from.append(QueueUrl)
+
+    def change_message_visibility_batch(self, QueueUrl, Entries):
+        self.visibility_batches.append(Entries)
+        return {"Successful": [{"Id": entry["Id"]} for entry in Entries], "Failed": []}
+
+
+def make_message(index):
+    body = {"message_id": f"msg_{index}", "data": {"email_subject": "Hello"}}
+    return {"Body": json.dumps(body), "ReceiptHandle": f"rh_{index}"}
+
+
+def test_release_messages_batches_visibility_zero():
+    consumer = SQSConsumer(settings.model_copy(update={"use_mock_sqs": False}))
+    consumer.sqs_client = StubSQSClient()
+
+    released = consumer.release_messages([make_message(i) for i in range(12)])
+
+    assert released == 12
+    assert [len(batch) for batch in consumer.sqs_client.visibility_batches] == [10, 2]
+    assert all(entry["VisibilityTimeout"] == 0 for batch in consumer.sqs_client.visibility_batches for entry in batch)
+
+
+def test_drain_finishes_in_flight_and_releases_rest(temp_cwd, monkeypatch):
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: None)
+    worker = EmailWorker()
+    worker.sqs = SQSConsumer(settings.model_copy(update={"use_mock_sqs": False}))
+    worker.sqs.sqs_client = StubSQSClient()
+    worker.sqs.delete_message = lambda message: True
+
+    upload = worker.s3.upload_email
+
+    def upload_then_signal(email_data, message_id):
+        worker._handle_signal(signal.SIGTERM, None)
+        return upload(email_data, message_id)
+
+    worker.s3.upload_email = upload_then_signal
+    worker._process_batch([make_message(i) for i in range(3)])
+    worker._finish_drain()
+
+    assert worker.messages_processed == 1
+    assert worker.messages_released == 2
+    assert [entry["ReceiptHandle"] for entry in worker.sqs.sqs_client.visibility_batches[0]] == ["rh_1", "rh_2"]
+    assert worker.drain_stats["within_deadline"] is True
+
+
+def test_long_poll_stays_within_drain_deadline():
+    consumer = SQSConsumer(settings.model_copy(update={"drain_timeout_seconds": 10, "receive_wait_time_seconds": 20}))
+    assert consumer.wait_seconds == 5
+
+    consumer = SQSConsumer(settings.model_copy(update={"drain_timeout_seconds": 60, "receive_wait_time_seconds": 20}))
+    assert consumer.wait_seconds == 20
+
+
+def test_signal_interrupts_poll_sleep(monkeypatch, caplog):
+    monkeypatch.setattr(signal, "signal", lambda signum, handler: None)
+    worker = EmailWorker()
+    worker._handle_signal(signal.SIGTERM, None)
+
+    started = time.monotonic()
+    with caplog.at_level(logging.INFO, logger="worker"):
+        worker._sleep(30)
+        worker._check_drain()
+
+    assert time.monotonic() - started < 1
+    assert worker.running is False and worker.draining is True
+    # logged once, when the sleep noticed the signal rather than after the drain
+    assert [r.getMessage() for r in caplog.records if "Draining" in r.getMessage()] == [
+        f"Received stop signal. Draining (deadline {settings.drain_timeout_seconds}s)..."
+    ]
+
+
+def test_client_timeouts_fit_drain_deadline():
+    drain_settings = settings.model_copy(update={"use_mock_sqs": False, "drain_timeout_seconds": 20})
+    s3_config = S3Uploader(drain_settings).s3_client.meta.config
+    sqs_config = SQSConsumer(drain_settings).sqs_client.meta.config
+
+    # put_object: two attempts of connect + read; delete_message: one attempt covering a long poll
+    s3_worst = s3_config.retries["total_max_attempts"] * (s3_config.connect_timeout + s3_config.read_timeout)
+    sqs_worst = sqs_config.retries["total_max_attempts"] * (sqs_config.connect_timeout + sqs_config.read_timeout)
+    assert s3_worst + sqs_worst < drain_settings.drain_timeout_seconds
+
+
+def test_weighted_fair_scheduler_follows_weights():
+    scheduler = WeightedFairScheduler({"high": 6, "normal": 3, "bulk": 1})
+
+    leaders = [scheduler.order()[0] for _ in range(100)]
+
+    assert leaders.count("high") == 60
+    assert leaders.count("normal") == 30
+    assert leaders.count("bulk") == 10
+
+
+def test_multi_lane_receive_falls_through_and_tags_lane():
+    lane_settings = settings.model_copy(
+        update={
+            "use_mock_sqs": False,
+            "sqs_queue_url": "https://sqs.local/main",
+            "sqs_priority_queue_urls": "high=https://sqs.local/high,bulk=https://sqs.local/bulk",
+        }
+    )
+    consumer = SQSConsumer(lane_settings)
+    consumer.sqs_client = StubSQSClient({"https://sqs.local/bulk": [make_message(1)]})
+
+    messages = consumer.receive_messages()
+
+    assert [m["Lane"] for m in messages] == ["bulk"]
+    assert consumer.delete_message(messages[0]) is True
+    assert consumer.sqs_client.deleted_from == ["https://sqs.local/bulk"]
+
+
+def test_failing_lane_does_not_stop_other_lanes():
+    lane_settings = settings.model_copy(
+        update={
+            "use_mock_sqs": False,
+            "sqs_queue_url": "https://sqs.local/main",
+            "sqs_priority_queue_urls": "high=https://sqs.local/high",
+        }
+    )
+    consumer = SQSConsumer(lane_settings)
+    consumer.sqs_client = StubSQSClient(
+        {"https://sqs.local/main": [make_message(1)]}, broken={"https://sqs.local/high"}
+    )
+
+    messages = consumer.receive_messages()
+
+    assert [m["Lane"] for m in messages] == ["normal"]
+
+
+def test_json_logging_samples_only_marked_success_records():
+    stream = io.StringIO()
+    log_settings = settings.model_copy(
+        update={"log_format": "json", "log_async": False, "log_sample_rates": "INFO=0", "log_level": "INFO"}
+    )
+    configure_logging(log_settings, stream=stream)
+    try:
+        log = logging.getLogger("sampling-test")
+        log.info("Message processed successfully: %s", "msg_1", extra={"sampled": True, "message_id": "msg_1"})
+        log.info("Worker starting")
+        log.error("Failed to upload message to S3: %s", "msg_2", extra={"sampled": True})
+    finally:
+        configure_logging(settings)
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [r["message"] for r in records] == ["Worker starting", "Failed to upload message to S3: msg_2"]
+    assert records[1]["levelname"] == "ERROR"
+
+
+def test_async_logging_writes_on_listener_thread():
+    stream = io.StringIO()
+    log_settings = settings.model_copy(
+        update={"log_format": "json", "log_async": True, "log_sample_rates": "", "log_level": "INFO"}
+    )
+    configure_logging(log_settings, stream=stream)
+    try:
+        logging.getLogger("async-test").info(
+            "Message processed successfully: %s", "msg_1", extra={"message_id": "msg_1"}
+        )
+        stop_logging()
+    finally:
+        configure_logging(settings)
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(r["message"], r["message_id"]) for r in records] == [("Message processed successfully: msg_1", "msg_1")]
+
+
+def test_reconfigure_stops_previous_listener():
+    first_stream, second_stream = io.StringIO(), io.StringIO()
+    log_settings = settings.model_copy(
+        update={"log_format": "text", "log_async": True, "log_sample_rates": "", "log_level": "INFO"}
+    )
+    try:
+        first = configure_logging(log_settings, stream=first_stream)
+        logging.getLogger("reconfigure-test").info("before")
+        second = configure_logging(log_settings, stream=second_stream)
+        # the first listener was stopped (and so flushed) before the new one took over
+        assert "before" in first_stream.getvalue()
+        assert log_config._listener is second and second is not first
+        logging.getLogger("reconfigure-test").info("after")
+        stop_logging()
+    finally:
+        configure_logging(settings)
+
+    assert "after" not in first_stream.getvalue()
+    assert "after" in second_stream.getvalue() and "before" not in second_stream.getvalue()
+
+
+def test_deferred_queue_handler_drops_only_sampled_records_when_full():
+    handler = DeferredQueueHandler(queue.Queue(maxsize=1))
+    log = logging.getLogger("queue-test")
+
+    def record(msg, sampled):
+        return log.makeRecord(log.name, logging.INFO, __file__, 0, msg, ("msg_1",), None, extra={"sampled": sampled})
+
+    first = record("Processed %s", True)
+    handler.handle(first)
+    handler.handle(record("Processed %s", True))
+
+    assert handler.dropped == 1
+    queued = handler.queue.get_nowait()
+    # left for the listener thread to format
+    assert queued is first and queued.args == ("msg_1",) and not hasattr(queued, "message")
+
+    handler.handle(record("Worker starting %s", False))
+    assert handler.queue.get_nowait().msg == "Worker starting %s"
+
+
+def test_stop_logging_falls_back_to_inline_writes():
+    stream = io.StringIO()
+    log_settings = settings.model_copy(
+        update={"log_format": "text", "log_async": True, "log_sample_rates": "", "log_level": "INFO"}
+    )
+    try:
+        configure_logging(log_settings, stream=stream)
+        stop_logging()
+        logging.getLogger("fallback-test").info("after stop")
+        assert dropped_records() == 0
+    finally:
+        configure_logging(settings)
+
+    assert "after stop" in stream.getvalue()
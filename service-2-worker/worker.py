@@ -8,22 +8,42 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
 import boto3
+from botocore.config import Config
 from config import settings
+from log_config import configure_logging, dropped_records
 
 # Configure logging
-logging.basicConfig(
-    level=settings.log_level,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+configure_logging(settings)
 logger = logging.getLogger(__name__)
 
+
+def call_timeout(settings) -> float:
+    """
+    Per-attempt connect/read timeout for S3 and SQS calls
+
+    A message in flight at SIGTERM still makes one put_object (two attempts)
+    and one delete_message (one attempt, plus the long-poll allowance), so a
+    twentieth of DRAIN_TIMEOUT_SECONDS keeps a hung call from outliving the
+    drain deadline and the ECS stopTimeout after it.
+    """
+    return max(settings.drain_timeout_seconds / 20, 0.5)
+
+
 class S3Uploader:
     """Handle S3 uploads"""
 
     def __init__(self, settings):
         self.settings = settings
         endpoint = settings.s3_endpoint_url or None
-        self.s3_client = boto3.client("s3", region_name=settings.aws_region, endpoint_url=endpoint)
+        timeout = call_timeout(settings)
+        self.s3_client = boto3.client(
+            "s3",
+            region_name=settings.aws_region,
+            endpoint_url=endpoint,
+            config=Config(
+                connect_timeout=timeout, read_timeout=timeout, retries={"total_max_attempts": 2, "mode": "standard"}
+            ),
+        )
 
     def upload_email(self, email_data: Dict[str, Any], message_id: str) -> bool:
         """
@@ -42,8 +62,12 @@ class S3Uploader:
                 with open(local_path, "w") as f:
                     json.dump(email_data, f, indent=2)
 
-                logger.info(f"S3 MOCK: Uploaded to {s3_key} ({local_path})")
-                print(f"[S3_MOCK] Uploaded: {s3_key}")
+                logger.info(
+                    "S3 MOCK: Uploaded to %s (%s)",
+                    s3_key,
+                    local_path,
+                    extra={"sampled": True, "message_id": message_id},
+                )
                 return True
 
             self.s3_client.put_object(
@@ -52,7 +76,12 @@ class S3Uploader:
                 Body=json.dumps(email_data, indent=2),
                 ContentType="application/json",
             )
-            logger.info(f"S3: Email uploaded to s3://{self.settings.s3_bucket_name}/{s3_key}")
+            logger.info(
+                "S3: Email uploaded to s3://%s/%s",
+                self.settings.s3_bucket_name,
+                s3_key,
+                extra={"sampled": True, "message_id": message_id},
+            )
             return True
 
         except Exception as e:
@@ -60,35 +89,91 @@ class S3Uploader:
             return False
 
 
+class WeightedFairScheduler:
+    """
+    Smooth weighted round-robin over priority lanes
+
+    Each call returns every lane, led by the lane whose turn it is; with all
+    lanes backlogged the leaders follow the weight ratio, and an empty leader
+    falls through to the next lane so no capacity is left idle.
+    """
+
+    def __init__(self, weights: Dict[str, int]):
+        self.weights = weights
+        self.total = sum(weights.values())
+        self.current = {lane: 0 for lane in weights}
+
+    def order(self) -> list:
+        for lane, weight in self.weights.items():
+            self.current[lane] += weight
+        leader = max(self.current, key=self.current.get)
+        self.current[leader] -= self.total
+        rest = sorted((lane for lane in self.weights if lane != leader), key=self.weights.get, reverse=True)
+        return [leader] + rest
+
+
 class SQSConsumer:
     """Handle SQS message consumption"""
 
     def __init__(self, settings):
         self.settings = settings
+        self.lanes = settings.lane_queue_urls()
+        # A SIGTERM during a long poll waits the poll out, so keep it to half the drain deadline
+        self.wait_seconds = max(0, min(settings.receive_wait_time_seconds, 20, settings.drain_timeout_seconds // 2))
+        self.scheduler = WeightedFairScheduler(settings.lane_weights())
         endpoint = settings.sqs_endpoint_url or None
+        # the read timeout has to cover a full long poll; a failed delete is not retried and the
+        # message is simply redelivered, so in-flight work stays inside the drain deadline
+        timeout = call_timeout(settings)
+        client_config = Config(
+            connect_timeout=timeout,
+            read_timeout=self.wait_seconds + timeout,
+            retries={"total_max_attempts": 1, "mode": "standard"},
+        )
         self.sqs_client = (
             None
             if settings.use_mock_sqs
-            else boto3.client("sqs", region_name=settings.aws_region, endpoint_url=endpoint)
+            else boto3.client("sqs", region_name=settings.aws_region, endpoint_url=endpoint, config=client_config)
         )
 
+    def _receive_from(self, lane: str, max_messages: int, wait_seconds: int) -> list:
+        queue_url = self.lanes[lane]
+        response = self.sqs_client.receive_message(
+            QueueUrl=queue_url,
+            MaxNumberOfMessages=min(max_messages, self.settings.max_messages_per_poll),
+            WaitTimeSeconds=wait_seconds,
+            MessageAttributeNames=["All"],
+            AttributeNames=["SentTimestamp"],
+        )
+
+        messages = response.get("Messages", [])
+        for message in messages:
+            message["Lane"] = lane
+            message["QueueUrl"] = queue_url
+        return messages
+
     def receive_messages(self, max_messages: int = 10) -> list:
         if self.settings.use_mock_sqs:
             logger.debug("USE_MOCK_SQS enabled: skipping receive_messages")
             return []
-        try:
-            response = self.sqs_client.receive_message(
-                QueueUrl=self.settings.sqs_queue_url,
-                MaxNumberOfMessages=min(max_messages, self.settings.max_messages_per_poll),
-                WaitTimeSeconds=20,
-                MessageAttributeNames=["All"],
-            )
-
-            return response.get("Messages", [])
+        if len(self.lanes) == 1:
+            try:
+                return self._receive_from("normal", max_messages, self.wait_seconds)
+            except Exception as e:
+                logger.error(f"Failed to receive messages from SQS: {str(e)}")
+                return []
 
-        except Exception as e:
-            logger.error(f"Failed to receive messages from SQS: {str(e)}")
-            return []
+        # one broken lane (bad URL, missing IAM grant) must not stall the others
+        for lane in self.scheduler.order():
+            wait_seconds = min(self.settings.lane_wait_time_seconds, self.wait_seconds)
+            try:
+                messages = self._receive_from(lane, max_messages, wait_seconds)
+            except Exception as e:
+                logger.error(f"Failed to receive messages from SQS lane {lane}: {str(e)}")
+                continue
+            if messages:
+                return messages
+        return []
 
     def delete_message(self, message: Dict[str, Any]) -> bool:
         if self.settings.use_mock_sqs:
@@ -96,7 +181,7 @@ class SQSConsumer:
             return True
         try:
             self.sqs_client.delete_message(
-                QueueUrl=self.settings.sqs_queue_url,
+                QueueUrl=message.get("QueueUrl", self.settings.sqs_queue_url),
                 ReceiptHandle=message["ReceiptHandle"],
             )
             logger.debug("Message deleted from SQS")
@@ -106,6 +191,45 @@ class SQSConsumer:
             logger.error(f"Failed to delete message: {str(e)}")
             return False
 
+    def release_messages(self, messages: list) -> int:
+        """
+        Hand messages back to the queue right away
+
+        Sets VisibilityTimeout=0 in batches of 10 so another consumer can pick
+        them up without waiting out the visibility timeout.
+        """
+        if not messages:
+            return 0
+        if self.settings.use_mock_sqs:
+            logger.debug("USE_MOCK_SQS enabled: skipping release_messages")
+            return len(messages)
+
+        by_queue = {}
+        for message in messages:
+            by_queue.setdefault(message.get("QueueUrl", self.settings.sqs_queue_url), []).append(message)
+
+        released = 0
+        for queue_url, queue_messages in by_queue.items():
+            for start in range(0, len(queue_messages), 10):
+                chunk = queue_messages[start : start + 10]
+                entries = [
+                    {"Id": str(i), "ReceiptHandle": message["ReceiptHandle"], "VisibilityTimeout": 0}
+                    for i, message in enumerate(chunk)
+                ]
+                try:
+                    response = self.sqs_client.change_message_visibility_batch(
+                        QueueUrl=queue_url,
+                        Entries=entries,
+                    )
+                    released += len(response.get("Successful", []))
+                    for failure in response.get("Failed", []):
+                        logger.warning(f"Failed to release message {failure.get('Id')}: {failure.get('Message')}")
+
+                except Exception as e:
+                    logger.error(f"Failed to release messages: {str(e)}")
+
+        return released
+
     def send_to_dlq(self, message: Dict[str, Any], error: str):
         if self.settings.use_mock_sqs:
             logger.error(f"USE_MOCK_SQS enabled: DLQ send skipped for message: {error}")
@@ -138,26 +262,89 @@ class EmailWorker:
         self.messages_failed = 0
         self.start_time = datetime.utcnow()
         self.last_processed_id = None
+        self.draining = False
+        self.drain_started = None
+        self.drain_logged = False
+        self.drain_stats = None
+        self.messages_released = 0
+        self.lane_stats = {}
 
         signal.signal(signal.SIGTERM, self._handle_signal)
         signal.signal(signal.SIGINT, self._handle_signal)
 
     def _handle_signal(self, signum, frame):
-        logger.info(f"Received signal {signum}. Shutting down gracefully...")
+        # Only flip flags here: the handler runs on the main thread between
+        # bytecodes and must not take locks the interrupted code may hold.
+        if not self.draining:
+            self.drain_started = time.monotonic()
+            self.draining = True
         self.running = False
 
+    def _check_drain(self) -> bool:
+        """Whether a stop signal has arrived; logs the start of the drain the first time it is seen"""
+        if self.draining and not self.drain_logged:
+            self.drain_logged = True
+            logger.info(f"Received stop signal. Draining (deadline {settings.drain_timeout_seconds}s)...")
+        return self.draining
+
+    def _sleep(self, seconds: float):
+        """Sleep in short slices so a stop request is noticed promptly"""
+        deadline = time.monotonic() + seconds
+        while self.running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, 0.2))
+        self._check_drain()
+
+    def _process_batch(self, messages: list):
+        for index, message in enumerate(messages):
+            # Once draining, nothing new is started: the rest of the batch goes
+            # straight back to the queue instead of waiting for the deadline.
+            if self._check_drain():
+                unstarted = messages[index:]
+                released = self.sqs.release_messages(unstarted)
+                self.messages_released += released
+                logger.info(f"Drain: released {released}/{len(unstarted)} unstarted message(s) back to the queue")
+                return
+            self._process_message(message)
+
+    def _finish_drain(self):
+        if not self.draining:
+            return
+
+        elapsed = time.monotonic() - self.drain_started
+        self.drain_stats = {
+            "drain_seconds": round(elapsed, 3),
+            "drain_deadline_seconds": settings.drain_timeout_seconds,
+            "within_deadline": elapsed <= settings.drain_timeout_seconds,
+            "messages_released": self.messages_released,
+        }
+        if self.drain_stats["within_deadline"]:
+            logger.info(f"Drain complete in {elapsed:.2f}s (released {self.messages_released})")
+        else:
+            logger.warning(
+                f"Drain took {elapsed:.2f}s, over the {settings.drain_timeout_seconds}s deadline "
+                f"(released {self.messages_released})"
+            )
+
     def _process_message(self, message: Dict[str, Any]) -> bool:
         try:
             body = json.loads(message["Body"])
             message_id = body.get("message_id", "unknown")
 
-            logger.info(f"Processing message: {message_id}")
+            logger.info("Processing message: %s", message_id, extra={"sampled": True, "message_id": message_id})
 
             if self.s3.upload_email(body, message_id):
                 if self.sqs.delete_message(message):
                     self.messages_processed += 1
                     self.last_processed_id = message_id
-                    logger.info(f"Message processed successfully: {message_id}")
+                    self._record_lane(message)
+                    logger.info(
+                        "Message processed successfully: %s",
+                        message_id,
+                        extra={"sampled": True, "message_id": message_id, "lane": message.get("Lane", "normal")},
+                    )
                     return True
 
                 logger.warning("Message uploaded but failed to delete from queue")
@@ -178,18 +365,40 @@ class EmailWorker:
             self.sqs.send_to_dlq(message, f"Processing error: {str(e)}")
             return False
 
+    def _record_lane(self, message: Dict[str, Any]):
+        lane = message.get("Lane", "normal")
+        stats = self.lane_stats.setdefault(lane, {"processed": 0, "last_lag_seconds": None, "max_lag_seconds": 0.0})
+        stats["processed"] += 1
+
+        sent_timestamp = message.get("Attributes", {}).get("SentTimestamp")
+        if sent_timestamp:
+            lag = max(time.time() - int(sent_timestamp) / 1000, 0.0)
+            stats["last_lag_seconds"] = round(lag, 3)
+            stats["max_lag_seconds"] = round(max(stats["max_lag_seconds"], lag), 3)
+
+    def _lane_report(self, uptime: float) -> Dict[str, Any]:
+        minutes = max(uptime / 60, 1 / 60)
+        return {
+            lane: dict(stats, throughput_per_minute=round(stats["processed"] / minutes, 2))
+            for lane, stats in self.lane_stats.items()
+        }
+
     def _write_health_check(self):
         try:
             uptime = (datetime.utcnow() - self.start_time).total_seconds()
 
             health_data = {
                 "timestamp": datetime.utcnow().isoformat() + "Z",
-                "status": "running",
+                "status": "draining" if self.draining else "running",
                 "messages_processed": self.messages_processed,
                 "messages_failed": self.messages_failed,
                 "last_processed_id": self.last_processed_id,
                 "uptime_seconds": int(uptime),
+                "lanes": self._lane_report(uptime),
+                "log_records_dropped": dropped_records(),
             }
+            if self.drain_stats:
+                health_data["drain"] = self.drain_stats
 
             health_file = Path("./health") / "worker-status.json"
             health_file.parent.mkdir(exist_ok=True)
@@ -197,7 +406,7 @@ class EmailWorker:
             with open(health_file, "w") as f:
                 json.dump(health_data, f, indent=2)
 
-            logger.debug(f"Health check written: {self.messages_processed} processed")
+            logger.debug("Health check written: %s processed", self.messages_processed)
 
         except Exception as e:
             logger.error(f"Failed to write health check: {str(e)}")
@@ -205,7 +414,9 @@ class EmailWorker:
     def run(self):
         logger.info("=== Email Worker Starting ===")
         logger.info(f"Poll interval: {settings.poll_interval_seconds}s")
+        logger.info(f"Long poll wait: {self.sqs.wait_seconds}s (drain deadline {settings.drain_timeout_seconds}s)")
         logger.info(f"SQS Queue: {settings.sqs_queue_url}")
+        logger.info(f"Priority lanes: {settings.lane_weights()}")
         logger.info(f"S3 Bucket: {settings.s3_bucket_name}")
 
         health_check_interval = 30
@@ -219,9 +430,8 @@ class EmailWorker:
                 messages = self.sqs.receive_messages(settings.max_messages_per_poll)
 
                 if messages:
-                    logger.info(f"Received {len(messages)} message(s)")
-                    for message in messages:
-                        self._process_message(message)
+                    logger.info("Received %s message(s)", len(messages), extra={"sampled": True})
+                    self._process_batch(messages)
                 else:
                     logger.debug("No messages available")
 
@@ -229,16 +439,19 @@ class EmailWorker:
                     self._write_health_check()
                     last_health_check = current_time
 
-                time.sleep(settings.poll_interval_seconds)
+                self._sleep(settings.poll_interval_seconds)
 
             except Exception as e:
                 logger.error(f"Error in worker loop: {str(e)}")
-                time.sleep(settings.poll_interval_seconds)
+                self._sleep(settings.poll_interval_seconds)
 
+        self._check_drain()
+        self._finish_drain()
         self._write_health_check()
         logger.info("=== Email Worker Stopped ===")
         logger.info(f"Total processed: {self.messages_processed}")
         logger.info(f"Total failed: {self.messages_failed}")
+        logger.info(f"Total released: {self.messages_released}")
 
 
 if __name__ == "__main__":
@@ -253,4 +466,3 @@ if __name__ == "__main__":
     except Exception as e:
         logger.error(f"Fatal error: {str(e)}")
         sys.exit(1)
-
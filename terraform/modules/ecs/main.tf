@@ -65,9 +65,10 @@ resource "aws_ecs_task_definition" "this" {
 
   container_definitions = jsonencode([
     {
-      name      = var.container_name
-      image     = var.container_image
-      essential = true
+      name        = var.container_name
+      image       = var.container_image
+      essential   = true
+      stopTimeout = var.stop_timeout
       portMappings = [
         {
           containerPort = var.container_port
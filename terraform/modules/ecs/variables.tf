@@ -95,6 +95,12 @@ variable "memory_target_value" {
   default     = 75
 }
 
+variable "stop_timeout" {
+  description = "Seconds ECS waits after SIGTERM before killing the container (max 120 on Fargate)"
+  type        = number
+  default     = 30
+}
+
 variable "private_subnet_ids" {
   description = "Private subnet IDs for the ECS tasks"
   type        = list(string)
@@ -31,3 +31,23 @@ resource "aws_sqs_queue" "main" {
   })
 }
 
+# Extra priority lanes (e.g. high, bulk); the main queue serves the "normal" lane
+resource "aws_sqs_queue" "lane" {
+  for_each = toset(var.priority_lanes)
+
+  name                       = "${local.base_name}-${each.key}-queue"
+  delay_seconds              = var.delay_seconds
+  message_retention_seconds  = var.message_retention_seconds
+  visibility_timeout_seconds = var.visibility_timeout_seconds
+
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.dlq.arn
+    maxReceiveCount     = var.max_receive_count
+  })
+
+  tags = merge(local.common_tags, {
+    Name     = "${local.base_name}-${each.key}-queue"
+    Priority = each.key
+  })
+}
+
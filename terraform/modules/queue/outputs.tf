@@ -18,3 +18,18 @@ output "dlq_arn" {
   value       = aws_sqs_queue.dlq.arn
 }
 
+
+output "lane_queue_urls" {
+  description = "Priority lane name -> queue URL (excludes the main/normal queue)"
+  value       = { for lane, queue in aws_sqs_queue.lane : lane => queue.id }
+}
+
+output "lane_queue_arns" {
+  description = "Priority lane name -> queue ARN (excludes the main/normal queue)"
+  value       = { for lane, queue in aws_sqs_queue.lane : lane => queue.arn }
+}
+
+output "lane_queue_names" {
+  description = "Priority lane name -> queue name (excludes the main/normal queue)"
+  value       = { for lane, queue in aws_sqs_queue.lane : lane => queue.name }
+}
@@ -32,6 +32,17 @@ variable "max_receive_count" {
   default     = 5
 }
 
+variable "priority_lanes" {
+  description = "Additional priority lanes to create a queue for (the main queue is the normal lane)"
+  type        = list(string)
+  default     = []
+
+  validation {
+    condition     = !contains(var.priority_lanes, "normal")
+    error_message = "The normal lane is served by the main queue; do not list it in priority_lanes."
+  }
+}
+
 variable "tags" {
   description = "Additional tags"
   type        = map(string)
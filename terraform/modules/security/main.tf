@@ -16,6 +16,17 @@ resource "aws_ssm_parameter" "api_token" {
   })
 }
 
+# Policy keys are API credentials too, so they are kept alongside the API token
+resource "aws_ssm_parameter" "token_priority_policy" {
+  name  = "/${var.project_name}/${var.environment}/token_priority_policy"
+  type  = "SecureString"
+  value = var.token_priority_policy != "" ? var.token_priority_policy : "none" # SSM rejects empty values
+
+  tags = merge(local.common_tags, {
+    Name = "${local.base_name}-token-priority-policy"
+  })
+}
+
 data "aws_iam_policy_document" "ecs_assume_role" {
   statement {
     actions = ["sts:AssumeRole"]
@@ -47,7 +58,7 @@ data "aws_iam_policy_document" "execution_policy" {
 
   statement {
     actions   = ["ssm:GetParameters", "ssm:GetParameter"]
-    resources = [aws_ssm_parameter.api_token.arn]
+    resources = [aws_ssm_parameter.api_token.arn, aws_ssm_parameter.token_priority_policy.arn]
   }
 }
 
@@ -73,7 +84,7 @@ data "aws_iam_policy_document" "task_policy" {
       "sqs:GetQueueUrl",
       "sqs:ChangeMessageVisibility"
     ]
-    resources = [var.sqs_queue_arn]
+    resources = concat([var.sqs_queue_arn], var.additional_sqs_queue_arns)
   }
 
   statement {
@@ -92,7 +103,7 @@ data "aws_iam_policy_document" "task_policy" {
 
   statement {
     actions   = ["ssm:GetParameters", "ssm:GetParameter"]
-    resources = [aws_ssm_parameter.api_token.arn]
+    resources = [aws_ssm_parameter.api_token.arn, aws_ssm_parameter.token_priority_policy.arn]
   }
 }
 
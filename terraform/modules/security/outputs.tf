@@ -13,3 +13,8 @@ output "ssm_parameter_arn" {
   value       = aws_ssm_parameter.api_token.arn
 }
 
+
+output "token_priority_policy_parameter_arn" {
+  description = "SSM parameter ARN for the token priority policy"
+  value       = aws_ssm_parameter.token_priority_policy.arn
+}
@@ -23,6 +23,12 @@ variable "sqs_queue_arn" {
   type        = string
 }
 
+variable "additional_sqs_queue_arns" {
+  description = "ARNs of extra SQS queues the tasks use (e.g. priority lanes)"
+  type        = list(string)
+  default     = []
+}
+
 variable "s3_bucket_arn" {
   description = "ARN of the S3 bucket"
   type        = string
@@ -34,6 +40,13 @@ variable "api_token" {
   sensitive   = true
 }
 
+variable "token_priority_policy" {
+  description = "Additional API tokens and their priority lane (<token>=<lane>,...) to store as SecureString in SSM"
+  type        = string
+  sensitive   = true
+  default     = ""
+}
+
 variable "tags" {
   description = "Additional tags"
   type        = map(string)
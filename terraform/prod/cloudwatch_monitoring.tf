@@ -1,6 +1,7 @@
 locals {
   dashboard_name = "${local.base_name}-monitoring-dashboard"
   queue_name     = "${local.base_name}-queue"
+  lane_queue_names = merge({ normal = local.queue_name }, module.queue.lane_queue_names)
   cicd_namespace = "HomeTask/CICD"
   cicd_build_workflow  = "build-and-push-ecr"
   cicd_deploy_workflow = "deploy-ecs"
@@ -204,6 +205,54 @@ locals {
           stat       = "Sum"
           period     = 300
         }
+      },
+      {
+        type    = "metric"
+        x       = 0
+        y       = 24
+        width   = 12
+        height  = 6
+        properties = {
+          view       = "timeSeries"
+          stacked    = false
+          region     = var.aws_region
+          title      = "Per-lane throughput (messages deleted)"
+          metrics    = [
+            for lane, name in local.lane_queue_names : [
+              "AWS/SQS",
+              "NumberOfMessagesDeleted",
+              "QueueName",
+              name,
+              { label = lane }
+            ]
+          ]
+          stat       = "Sum"
+          period     = 60
+        }
+      },
+      {
+        type    = "metric"
+        x       = 12
+        y       = 24
+        width   = 12
+        height  = 6
+        properties = {
+          view       = "timeSeries"
+          stacked    = false
+          region     = var.aws_region
+          title      = "Per-lane lag (oldest message age)"
+          metrics    = [
+            for lane, name in local.lane_queue_names : [
+              "AWS/SQS",
+              "ApproximateAgeOfOldestMessage",
+              "QueueName",
+              name,
+              { label = lane }
+            ]
+          ]
+          stat       = "Maximum"
+          period     = 60
+        }
       }
     ]
   })
@@ -56,7 +56,8 @@ module "ecs_worker" {
   target_group_arn           = ""
   log_retention_days         = var.worker_log_retention_days
   container_insights_enabled = var.worker_container_insights_enabled
-  environment_variables      = local.combined_env_vars
+  stop_timeout               = var.worker_drain_timeout_seconds + 10
+  environment_variables      = merge(local.combined_env_vars, { DRAIN_TIMEOUT_SECONDS = tostring(var.worker_drain_timeout_seconds) })
   secrets                    = local.merged_secret_vars
   ecs_execution_role_arn     = module.security.ecs_execution_role_arn
   ecs_task_role_arn          = module.security.ecs_task_role_arn
@@ -11,7 +11,10 @@ locals {
   )
 
   merged_secret_vars = merge(
-    { API_TOKEN = module.security.ssm_parameter_arn },
+    {
+      API_TOKEN             = module.security.ssm_parameter_arn
+      TOKEN_PRIORITY_POLICY = module.security.token_priority_policy_parameter_arn
+    },
     var.secrets
   )
 
@@ -32,9 +35,12 @@ locals {
   combined_env_vars = merge(
     local.merged_env_vars,
     {
-      AWS_REGION    = var.aws_region
-      USE_MOCK_SQS  = "false"
-      SQS_QUEUE_URL = module.queue.queue_url
+      AWS_REGION              = var.aws_region
+      USE_MOCK_SQS            = "false"
+      SQS_QUEUE_URL           = module.queue.queue_url
+      SQS_PRIORITY_QUEUE_URLS = join(",", [for lane, url in module.queue.lane_queue_urls : "${lane}=${url}"])
+      PRIORITY_WEIGHTS        = var.queue_priority_weights
+      LOG_FORMAT              = "json"
     }
   )
 }
@@ -53,6 +53,11 @@ output "sqs_queue_url" {
   description = "SQS queue URL"
 }
 
+output "sqs_lane_queue_urls" {
+  value       = module.queue.lane_queue_urls
+  description = "Priority lane SQS queue URLs"
+}
+
 output "ssm_parameter_arn" {
   value       = module.security.ssm_parameter_arn
   description = "SSM parameter ARN for API token"
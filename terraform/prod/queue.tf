@@ -6,6 +6,7 @@ module "queue" {
   message_retention_seconds  = var.queue_message_retention_seconds
   visibility_timeout_seconds = var.queue_visibility_timeout_seconds
   max_receive_count          = var.queue_max_receive_count
+  priority_lanes             = var.queue_priority_lanes
   tags                       = var.tags
 }
 
@@ -8,5 +8,8 @@ module "security" {
   s3_bucket_arn  = module.storage.bucket_arn
   api_token      = var.api_token
   tags           = var.tags
+
+  token_priority_policy     = var.token_priority_policy
+  additional_sqs_queue_arns = values(module.queue.lane_queue_arns)
 }
 
@@ -155,6 +155,12 @@ variable "worker_log_retention_days" {
   type        = number
 }
 
+variable "worker_drain_timeout_seconds" {
+  description = "Worker drain deadline after SIGTERM; the container stop timeout adds a 10s margin"
+  type        = number
+  default     = 20
+}
+
 variable "api_image_tag" {
   description = "Tag for the API image (built from ECR repo URL + tag)"
   type        = string
@@ -191,6 +197,18 @@ variable "queue_max_receive_count" {
   default     = 5
 }
 
+variable "queue_priority_lanes" {
+  description = "Extra priority lanes with their own queue (main queue is the normal lane)"
+  type        = list(string)
+  default     = ["high", "bulk"]
+}
+
+variable "queue_priority_weights" {
+  description = "Worker weighted-fair polling weights per lane (lane=weight,...)"
+  type        = string
+  default     = "high=6,normal=3,bulk=1"
+}
+
 variable "alb_deletion_protection" {
   description = "Enable ALB deletion protection"
   type        = bool
@@ -239,6 +257,13 @@ variable "api_token" {
   sensitive   = true
 }
 
+variable "token_priority_policy" {
+  description = "Additional API tokens pinned to a priority lane (<token>=<lane>,...), stored in SSM"
+  type        = string
+  sensitive   = true
+  default     = ""
+}
+
 variable "ecr_repositories" {
   description = "ECR repositories to create (suffix names); repo will be <project>-<env>-<suffix>"
   type        = list(string)